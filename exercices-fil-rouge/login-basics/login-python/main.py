@@ -7,11 +7,39 @@ from fastapi.staticfiles import StaticFiles # pour servir les fichiers statiques
 from passlib.context import CryptContext # pour le hachage des mots de passe (pip install passlib[bcrypt])
 import psycopg # pour se connecter à PostgreSQL (pip install psycopg[binary])
 from psycopg.rows import dict_row # pour obtenir des résultats sous forme de dictionnaire
+from psycopg_pool import ConnectionPool # pool de connexions PostgreSQL (pip install psycopg[pool])
 from starlette.middleware.sessions import SessionMiddleware # pour gérer les sessions utilisateur (pip install starlette)
 from datetime import datetime # c'est compris
+from contextlib import asynccontextmanager
+import os
+
+# config PostgreSQL (modifiable par variables d'environnement)
+INFOS_CONNEXION = os.getenv("DATABASE_URL", "dbname=2025_M1 user=postgres password=postgres host=localhost port=5430")
+TAILLE_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2")) # connexions toujours ouvertes
+TAILLE_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10")) # connexions max en même temps
+ATTENTE_POOL_MAX = float(os.getenv("DB_POOL_TIMEOUT", "10")) # attente max (en secondes) d'une connexion libre
+
+# pool de connexions : les connexions sont ouvertes une fois puis réutilisées d'une requête à l'autre
+# (sinon chaque /login et /register refait la connexion TCP + l'authentification à PostgreSQL)
+poolConnexions = ConnectionPool(
+    conninfo=INFOS_CONNEXION,
+    min_size=TAILLE_POOL_MIN,
+    max_size=TAILLE_POOL_MAX,
+    timeout=ATTENTE_POOL_MAX,
+    kwargs={"row_factory": dict_row},
+    name="login-python",
+    open=False # ouvert au démarrage de l'application (voir cycleDeVie)
+)
+
+@asynccontextmanager
+async def cycleDeVie(app):
+    """Ouvre le pool au démarrage de l'application et le ferme à l'arrêt"""
+    poolConnexions.open()
+    yield
+    poolConnexions.close()
 
 # confi FastAPI
-app = FastAPI()
+app = FastAPI(lifespan=cycleDeVie)
 app.add_middleware(SessionMiddleware, secret_key="eziuzhfeuihHIUZEFHIEUHhiauhu")
 
 
@@ -26,15 +54,10 @@ contextePassword = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # connexion PostgreSQL
 def obtenirDb():
-    with psycopg.connect(
-        dbname="2025_M1",
-        user="postgres",
-        password="postgres",
-        host="localhost", 
-        port="5430",
-        row_factory=dict_row
-    ) as connexion:
-        yield connexion # yield permet de retourner une valeur tout en garantissant que la connexion sera fermée après usage
+    # la connexion est empruntée au pool puis rendue après la requête :
+    # commit si tout s'est bien passé, rollback si une erreur est remontée
+    with poolConnexions.connection() as connexion:
+        yield connexion # yield permet de retourner une valeur tout en garantissant que la connexion sera rendue après usage
 
 # Fonctions utiles
 def verifierPassword(passwordClair, passwordHache):
@@ -178,4 +201,9 @@ def inscription(request: Request, login: str = Form(...), email: str = Form(...)
             "error": "Erreur lors de la création du compte"
         })
 
+# statistiques du pool (connexions ouvertes, en attente, temps d'attente...)
+@app.get("/stats/pool")
+def statistiquesPool():
+    return poolConnexions.get_stats()
+
 # cmd : uvicorn main:app --reload
\ No newline at end of file
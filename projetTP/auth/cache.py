@@ -0,0 +1,106 @@
+"""
+Cache des tokens JWT déjà vérifiés pour l'application Dactylogame.
+
+Sans cache, chaque requête authentifiée refait un jwt.decode (vérification de signature)
+et un SELECT sur users. Un token est valable 30 jours, on garde donc en mémoire,
+pour chaque token :
+- les claims vérifiés (dont exp)
+- un instantané léger de l'utilisateur (CachedUser)
+
+Une entrée expire à la date exp du token, ou au plus tard TOKEN_CACHE_TTL secondes
+après sa mise en cache. Les entrées d'un utilisateur sont supprimées quand sa ligne
+en BDD est modifiée ou supprimée (voir invalidate_user).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+# Nombre maximum de tokens gardés en mémoire (les moins récemment utilisés sont retirés)
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+# Durée maximale (en secondes) avant de revérifier le token et de relire l'utilisateur en BDD
+TOKEN_CACHE_TTL = int(os.getenv("TOKEN_CACHE_TTL", "300"))
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Instantané léger d'un utilisateur (utilisé à la place de l'objet User de l'ORM)"""
+    id: int
+    username: str
+    email: str
+    created_at: datetime
+
+    @classmethod
+    def from_user(cls, user) -> "CachedUser":
+        return cls(id=user.id, username=user.username, email=user.email, created_at=user.created_at)
+
+
+class TokenCache:
+    """Cache LRU + TTL des tokens vérifiés, indexé par token"""
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE, ttl: float = TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        # token -> (expire_at (timestamp), claims, user)
+        self._entries: OrderedDict[str, tuple[float, dict, CachedUser]] = OrderedDict()
+        # les dépendances synchrones tournent dans le threadpool : accès protégé par un verrou
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[CachedUser]:
+        """Retourne l'utilisateur associé au token s'il est en cache et pas expiré"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.time():
+                del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, token: str, claims: dict, user) -> CachedUser:
+        """
+        Met en cache un token vérifié.
+
+        Args:
+            token: Le token JWT
+            claims: Les claims décodés (exp est respecté)
+            user: L'utilisateur (objet User de l'ORM)
+
+        Returns:
+            L'instantané de l'utilisateur mis en cache
+        """
+        snapshot = CachedUser.from_user(user)
+        expire_at = time.time() + self.ttl
+        if claims.get("exp") is not None:
+            expire_at = min(expire_at, float(claims["exp"]))
+
+        with self._lock:
+            self._entries[token] = (expire_at, claims, snapshot)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Retire du cache tous les tokens d'un utilisateur (appelé quand sa ligne change en BDD)"""
+        with self._lock:
+            for token in [t for t, entry in self._entries.items() if entry[2].id == user_id]:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Compteurs du cache (exposés par /api/internal/stats)"""
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
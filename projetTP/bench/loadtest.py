@@ -0,0 +1,309 @@
+"""
+Test de charge de l'API Dactylogame.
+
+Simule N joueurs virtuels qui jouent chacun une partie complète :
+    (inscription + connexion) -> /api/start-game -> 50 x /api/check-word -> /api/end-game -> /api/ranking
+
+Par défaut l'application est lancée en local (uvicorn) sur une base SQLite temporaire.
+Le rapport JSON donne, pour chaque route, les latences p50 / p95 / p99, le débit et le taux d'erreur,
+ce qui permet de comparer deux commits.
+
+Exemples (depuis le dossier projetTP) :
+    python bench/loadtest.py --players 50 --output bench/rapport.json
+    python bench/loadtest.py --players 200 --wpm 0            # sans pause entre les mots (débit max)
+    python bench/loadtest.py --url http://localhost:8000       # contre un serveur déjà lancé
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+import httpx
+
+# Dossier de l'application (parent de bench/)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Attente max (en secondes) du démarrage du serveur local
+SERVER_START_TIMEOUT = 30
+
+
+class Recorder:
+    """Latences et erreurs de chaque route"""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.status_codes: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        """
+        Envoie une requête et note sa latence.
+
+        Args:
+            client: Le client HTTP
+            route: Nom de la route dans le rapport (ex: "POST /api/check-word")
+            method: Méthode HTTP
+            url: URL relative à l'URL de base du client
+
+        Returns:
+            La réponse, ou None en cas d'erreur réseau
+        """
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.latencies[route].append(time.perf_counter() - started)
+            self.errors[route] += 1
+            self.status_codes[route][0] += 1
+            return None
+
+        self.latencies[route].append(time.perf_counter() - started)
+        self.status_codes[route][response.status_code] += 1
+        if response.status_code >= 400:
+            self.errors[route] += 1
+        return response
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Percentile (méthode du rang le plus proche) d'une liste déjà triée"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+async def play(client: httpx.AsyncClient, recorder: Recorder, player: int, args, run_id: str) -> bool:
+    """
+    Joue une partie complète pour un joueur virtuel.
+
+    Args:
+        client: Le client HTTP
+        recorder: Le Recorder où noter les latences
+        player: Numéro du joueur
+        args: Les options de la ligne de commande
+        run_id: Identifiant du test (rend les noms d'utilisateur uniques)
+
+    Returns:
+        True si la partie est allée jusqu'au bout sans erreur
+    """
+    rng = random.Random(f"{args.seed}-{player}")
+    headers = {}
+
+    if rng.random() < args.register_ratio:
+        username = f"bench_{run_id}_{player}"
+        password = f"mdp-{run_id}-{player}"
+        response = await recorder.request(client, "POST /api/auth/register", "POST", "/api/auth/register", json={
+            'username': username, 'email': f"{username}@example.com", 'password': password
+        })
+        if response is None or response.status_code != 201:
+            return False
+        response = await recorder.request(client, "POST /api/auth/login", "POST", "/api/auth/login", data={
+            'username': username, 'password': password
+        })
+        if response is None or response.status_code != 200:
+            return False
+        headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+
+    response = await recorder.request(client, "POST /api/start-game", "POST", "/api/start-game", headers=headers)
+    if response is None or response.status_code != 200:
+        return False
+    game = response.json()
+
+    # cadence de frappe : wpm mots par minute en moyenne, avec +/- 30% d'écart entre deux mots
+    word_delay = 60 / args.wpm if args.wpm > 0 else 0
+    for index, word in enumerate(game['texte'][:args.words]):
+        if word_delay:
+            await asyncio.sleep(word_delay * rng.uniform(0.7, 1.3))
+        typed = word if rng.random() >= args.error_rate else word + "x"
+        response = await recorder.request(client, "POST /api/check-word", "POST", "/api/check-word", json={
+            'session_id': game['session_id'], 'word': typed, 'index': index
+        })
+        if response is None or response.status_code != 200:
+            return False
+
+    response = await recorder.request(client, "POST /api/end-game", "POST", "/api/end-game", headers=headers, json={
+        'session_id': game['session_id']
+    })
+    if response is None or response.status_code != 200:
+        return False
+
+    response = await recorder.request(client, "GET /api/ranking", "GET", "/api/ranking", headers=headers)
+    return response is not None and response.status_code == 200
+
+
+async def run_load(base_url: str, args) -> dict:
+    """
+    Lance tous les joueurs virtuels (au plus args.concurrency en même temps) et construit le rapport.
+
+    Args:
+        base_url: URL du serveur testé
+        args: Les options de la ligne de commande
+
+    Returns:
+        Le rapport (dict sérialisable en JSON)
+    """
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    slots = asyncio.Semaphore(args.concurrency or args.players)
+    limits = httpx.Limits(max_connections=args.concurrency or args.players)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        async def player_task(player: int) -> bool:
+            async with slots:
+                return await play(client, recorder, player, args, run_id)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(player_task(i) for i in range(args.players)))
+        elapsed = time.perf_counter() - started
+
+    routes = {}
+    for route, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        routes[route] = {
+            'count': len(latencies),
+            'errors': recorder.errors[route],
+            'error_rate': round(recorder.errors[route] / len(latencies), 4),
+            'requests_per_s': round(len(latencies) / elapsed, 2),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 2),
+            'max_ms': round(latencies[-1] * 1000, 2),
+            'status_codes': {str(code): n for code, n in sorted(recorder.status_codes[route].items())}
+        }
+
+    total_requests = sum(route['count'] for route in routes.values())
+    total_errors = sum(route['errors'] for route in routes.values())
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'base_url': base_url,
+            'players': args.players,
+            'concurrency': args.concurrency or args.players,
+            'words': args.words,
+            'wpm': args.wpm,
+            'register_ratio': args.register_ratio,
+            'error_rate': args.error_rate,
+            'seed': args.seed
+        },
+        'duration_s': round(elapsed, 3),
+        'players_completed': sum(results),
+        'players_failed': len(results) - sum(results),
+        'total_requests': total_requests,
+        'requests_per_s': round(total_requests / elapsed, 2),
+        'error_rate': round(total_errors / total_requests, 4) if total_requests else 0.0,
+        'routes': routes
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Commit courant (pour comparer les rapports entre commits)"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port: int, database_path: str) -> subprocess.Popen:
+    """
+    Lance l'application avec uvicorn sur une base SQLite, et attend qu'elle réponde.
+
+    Args:
+        port: Port d'écoute
+        database_path: Chemin du fichier SQLite (créé au démarrage)
+
+    Returns:
+        Le processus du serveur (à arrêter avec terminate)
+    """
+    env = {
+        **os.environ,
+        'DATABASE_URL': f"sqlite:///{database_path}",
+        'PURGE_INTERVAL': '0',
+        # tous les joueurs virtuels ont la même IP : la limitation de débit fausserait la mesure
+        'RATE_LIMIT': os.getenv('RATE_LIMIT', '0')
+    }
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=APP_DIR,
+        env=env
+    )
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("Le serveur s'est arrêté au démarrage")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/ranking", timeout=1)
+            return server
+        except httpx.HTTPError:
+            time.sleep(0.2)
+
+    server.terminate()
+    raise RuntimeError("Le serveur n'a pas démarré à temps")
+
+
+def parse_args(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Test de charge de l'API Dactylogame")
+    parser.add_argument('--players', type=int, default=20, help="Nombre de joueurs virtuels")
+    parser.add_argument('--concurrency', type=int, default=0, help="Joueurs en même temps (0 = tous)")
+    parser.add_argument('--words', type=int, default=50, help="Nombre de mots tapés par partie")
+    parser.add_argument('--wpm', type=float, default=60, help="Mots par minute de chaque joueur (0 = sans pause)")
+    parser.add_argument('--register-ratio', type=float, default=0.5, help="Part des joueurs qui s'inscrivent")
+    parser.add_argument('--error-rate', type=float, default=0.05, help="Part des mots mal tapés")
+    parser.add_argument('--seed', type=int, default=42, help="Graine (même graine = même scénario)")
+    parser.add_argument('--timeout', type=float, default=30, help="Timeout (en secondes) d'une requête")
+    parser.add_argument('--url', help="URL d'un serveur déjà lancé (sinon lancé en local sur SQLite)")
+    parser.add_argument('--output', help="Fichier où écrire le rapport JSON (sinon affiché)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if args.url:
+        report = asyncio.run(run_load(args.url.rstrip('/'), args))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            port = free_port()
+            server = start_server(port, os.path.join(tmp, 'bench.db'))
+            try:
+                report = asyncio.run(run_load(f"http://127.0.0.1:{port}", args))
+            finally:
+                server.terminate()
+                server.wait()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+        print(f"Rapport écrit dans {args.output} : {report['requests_per_s']} req/s, "
+              f"{report['players_completed']}/{args.players} parties terminées")
+    else:
+        print(output)
+    return 0 if report['players_failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Micro-benchmark de l'encodage JSON des réponses de l'API Dactylogame.
+
+Compare, pour une page du classement de --rows joueurs et pour les petites réponses de jeu :
+- "jsonable_encoder + json" : l'ancien chemin (dict sans modèle de réponse, JSONResponse)
+- "modèle + orjson" : modèle de réponse pydantic puis FastJSONResponse (routes de jeu)
+- "page en cache" : la liste déjà encodée, insérée telle quelle (encode_with, /api/ranking)
+
+Exemples (depuis le dossier projetTP) :
+    python bench/serialization.py
+    python bench/serialization.py --rows 200 --number 2000 --output bench/serialisation.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+from typing import Optional
+
+# Dossier de l'application (parent de bench/)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+# l'import de main ne doit pas dépendre du serveur MySQL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("PURGE_INTERVAL", "0")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import main as application
+from bench.loadtest import git_commit
+from game.leaderboard import RankingPage, RankingRow
+from web import responses
+from web.responses import FastJSONResponse, encode_with
+
+
+def ranking_rows(count: int) -> list[RankingRow]:
+    """Une page du classement (un score distinct tous les 3 joueurs, quelques joueurs anonymes)"""
+    return [
+        RankingRow(i // 3 + 1, None if i % 50 == 0 else 1000 + i, 'Inconnu' if i % 50 == 0 else f'joueur_{i}', 60 - i // 3)
+        for i in range(count)
+    ]
+
+
+def measure(function, number: int, repeat: int) -> float:
+    """Durée médiane d'un appel (en microsecondes)"""
+    timings = timeit.repeat(function, number=number, repeat=repeat)
+    return statistics.median(timings) / number * 1e6
+
+
+def ranking_cases(rows: list[RankingRow]) -> dict:
+    """Les trois façons d'encoder la réponse de /api/ranking"""
+    page = RankingPage(rows, has_more=True)
+    current_user = {'rank': 4, 'user_id': 1003, 'username': 'joueur_3', 'best_score': 57}
+    rest = {'current_user': current_user, 'limit': len(rows), 'offset': 0, 'has_more': True, 'period': 'all', 'period_start': None}
+    payload = {'ranking': [row._asdict() for row in rows], **rest}
+
+    def legacy():
+        # ancien chemin : les dicts de la page recopiés, puis jsonable_encoder + json.dumps
+        return JSONResponse(jsonable_encoder({**payload, 'ranking': [dict(item) for item in payload['ranking']]})).body
+
+    def model():
+        return FastJSONResponse(application.RankingResponse.model_validate(payload).model_dump(mode='json')).body
+
+    def cached():
+        return encode_with(rest, ranking=page.json)
+
+    assert json.loads(legacy()) == json.loads(model()) == json.loads(cached())
+    return {'jsonable_encoder + json': legacy, 'modèle + orjson': model, 'page en cache': cached}
+
+
+def game_cases() -> dict:
+    """Les petites réponses de /api/check-word et /api/end-game"""
+    word = {'correct': True, 'index': 12}
+    result = {'score': 42, 'words_correct': 42, 'words_wrong': 3, 'duration': 30}
+    return {
+        'check-word : jsonable_encoder + json': lambda: JSONResponse(jsonable_encoder(word)).body,
+        'check-word : modèle + orjson': lambda: FastJSONResponse(application.WordChecked.model_validate(word).model_dump(mode='json')).body,
+        'end-game : jsonable_encoder + json': lambda: JSONResponse(jsonable_encoder(result)).body,
+        'end-game : modèle + orjson': lambda: FastJSONResponse(application.GameResult.model_validate(result).model_dump(mode='json')).body,
+    }
+
+
+def parse_args(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark de l'encodage JSON des réponses")
+    parser.add_argument('--rows', type=int, default=200, help="Nombre de joueurs dans la page du classement")
+    parser.add_argument('--number', type=int, default=1000, help="Nombre d'appels par mesure")
+    parser.add_argument('--repeat', type=int, default=5, help="Nombre de mesures (on garde la médiane)")
+    parser.add_argument('--output', help="Fichier où écrire le rapport JSON (sinon affiché)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = parse_args(argv)
+
+    results = {}
+    for name, function in ranking_cases(ranking_rows(args.rows)).items():
+        results[f'ranking ({args.rows} joueurs) : {name}'] = {
+            'us_per_call': round(measure(function, args.number, args.repeat), 2),
+            'bytes': len(function())
+        }
+    for name, function in game_cases().items():
+        results[name] = {
+            'us_per_call': round(measure(function, args.number * 10, args.repeat), 2),
+            'bytes': len(function())
+        }
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'orjson': responses.orjson is not None,
+        'rows': args.rows,
+        'results': results,
+    }
+
+    width = max(len(name) for name in results)
+    for name, result in results.items():
+        print(f"{name:<{width}}  {result['us_per_call']:>10.2f} µs  {result['bytes']:>7} octets", file=sys.stderr)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,6 +23,19 @@ SET time_zone = "+00:00";
 
 -- --------------------------------------------------------
 
+--
+-- Structure de la table `best_scores`
+--
+
+CREATE TABLE `best_scores` (
+  `player_id` int(11) NOT NULL COMMENT 'user_id, ou 0 pour les joueurs anonymes',
+  `user_id` int(11) DEFAULT NULL,
+  `best_score` int(11) NOT NULL DEFAULT 0,
+  `achieved_at` timestamp NOT NULL DEFAULT current_timestamp()
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Structure de la table `game_sessions`
 --
@@ -31,8 +44,10 @@ CREATE TABLE `game_sessions` (
   `id` int(11) NOT NULL,
   `user_id` int(11),
   `session_token` varchar(64) NOT NULL,
-  `words_sequence` text NOT NULL,
+  `words_sequence` text DEFAULT NULL COMMENT 'Anciennes parties uniquement',
   `seed` varchar(32) NOT NULL,
+  `words_version` varchar(16) DEFAULT NULL COMMENT 'Version de la liste de mots',
+  `words_count` int(11) NOT NULL DEFAULT 50,
   `start_time` timestamp NOT NULL DEFAULT current_timestamp(),
   `expected_end_time` timestamp NOT NULL DEFAULT current_timestamp(),
   `is_completed` tinyint(1) DEFAULT 0,
@@ -43,6 +58,38 @@ CREATE TABLE `game_sessions` (
 
 -- --------------------------------------------------------
 
+--
+-- Structure de la table `period_best_scores`
+--
+
+CREATE TABLE `period_best_scores` (
+  `period` varchar(8) NOT NULL COMMENT 'day ou week',
+  `period_start` date NOT NULL COMMENT 'Le jour, ou le lundi de la semaine',
+  `player_id` int(11) NOT NULL COMMENT 'user_id, ou 0 pour les joueurs anonymes',
+  `user_id` int(11) DEFAULT NULL,
+  `best_score` int(11) NOT NULL DEFAULT 0,
+  `achieved_at` timestamp NOT NULL DEFAULT current_timestamp()
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Structure de la table `player_stats`
+--
+
+CREATE TABLE `player_stats` (
+  `user_id` int(11) NOT NULL,
+  `games_played` int(11) NOT NULL DEFAULT 0,
+  `total_score` int(11) NOT NULL DEFAULT 0,
+  `best_score` int(11) NOT NULL DEFAULT 0,
+  `total_correct` int(11) NOT NULL DEFAULT 0,
+  `total_wrong` int(11) NOT NULL DEFAULT 0,
+  `total_duration` int(11) NOT NULL DEFAULT 0 COMMENT 'Durée totale de jeu en secondes',
+  `last_played_at` timestamp NULL DEFAULT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- --------------------------------------------------------
+
 --
 -- Structure de la table `scores`
 --
@@ -88,6 +135,14 @@ INSERT INTO `users` (`id`, `username`, `email`, `password_hash`, `created_at`, `
 -- Index pour les tables déchargées
 --
 
+--
+-- Index pour la table `best_scores`
+--
+ALTER TABLE `best_scores`
+  ADD PRIMARY KEY (`player_id`),
+  ADD UNIQUE KEY `user_id` (`user_id`),
+  ADD KEY `idx_ranking` (`best_score` DESC, `achieved_at`, `player_id`);
+
 --
 -- Index pour la table `game_sessions`
 --
@@ -95,14 +150,30 @@ ALTER TABLE `game_sessions`
   ADD PRIMARY KEY (`id`),
   ADD UNIQUE KEY `session_token` (`session_token`),
   ADD KEY `idx_user_id` (`user_id`),
+  ADD KEY `idx_purge` (`is_completed`, `expected_end_time`),
   ADD KEY `score_id` (`score_id`);
 
+--
+-- Index pour la table `period_best_scores`
+--
+ALTER TABLE `period_best_scores`
+  ADD PRIMARY KEY (`period`, `period_start`, `player_id`),
+  ADD KEY `idx_period_ranking` (`period`, `period_start`, `best_score` DESC, `achieved_at`, `player_id`),
+  ADD KEY `user_id` (`user_id`);
+
+--
+-- Index pour la table `player_stats`
+--
+ALTER TABLE `player_stats`
+  ADD PRIMARY KEY (`user_id`);
+
 --
 -- Index pour la table `scores`
 --
 ALTER TABLE `scores`
   ADD PRIMARY KEY (`id`),
-  ADD KEY `idx_user_id` (`user_id`),
+  ADD KEY `idx_user_score` (`user_id`, `score`),
+  ADD KEY `idx_user_created` (`user_id`, `created_at`),
   ADD KEY `idx_score` (`score`),
   ADD KEY `idx_created_at` (`created_at`);
 
@@ -142,6 +213,12 @@ ALTER TABLE `users`
 -- Contraintes pour les tables déchargées
 --
 
+--
+-- Contraintes pour la table `best_scores`
+--
+ALTER TABLE `best_scores`
+  ADD CONSTRAINT `best_scores_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE;
+
 --
 -- Contraintes pour la table `game_sessions`
 --
@@ -149,6 +226,18 @@ ALTER TABLE `game_sessions`
   ADD CONSTRAINT `game_sessions_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE,
   ADD CONSTRAINT `game_sessions_ibfk_2` FOREIGN KEY (`score_id`) REFERENCES `scores` (`id`) ON DELETE SET NULL;
 
+--
+-- Contraintes pour la table `period_best_scores`
+--
+ALTER TABLE `period_best_scores`
+  ADD CONSTRAINT `period_best_scores_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE;
+
+--
+-- Contraintes pour la table `player_stats`
+--
+ALTER TABLE `player_stats`
+  ADD CONSTRAINT `player_stats_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE;
+
 --
 -- Contraintes pour la table `scores`
 --
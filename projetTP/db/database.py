@@ -1,14 +1,111 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+import os
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, Index, desc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
+from db.pool import TimedQueuePool, TimedAsyncQueuePool
 
 # Configuration de la base de données
-DATABASE_URL = "mysql+pymysql://root:@localhost:3306/dactylogame"
+MYSQL_URL = "mysql+pymysql://root:@localhost:3306/dactylogame"
+# fichier SQLite à la racine du projet (quel que soit le dossier depuis lequel on lance le serveur)
+SQLITE_URL = "sqlite:///" + os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dactylogame.db")
+# DATABASE_URL est prioritaire, sinon DB_BACKEND=sqlite pour tester / benchmarker en local sans MySQL
+DATABASE_URL = os.getenv("DATABASE_URL") or (SQLITE_URL if os.getenv("DB_BACKEND") == "sqlite" else MYSQL_URL)
 
-engine = create_engine(DATABASE_URL)
+# Réglages du pool de connexions
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # connexions gardées ouvertes
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))  # connexions en plus lors des pics
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))  # attente max (en secondes) d'une connexion libre
+# une connexion est renouvelée au bout de DB_POOL_RECYCLE secondes (à garder sous le wait_timeout de MySQL)
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# vérifie la connexion avant de la donner (évite les erreurs "MySQL server has gone away")
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") == "1"
+# durée max d'une requête (en millisecondes), 0 pour ne pas limiter
+DB_STATEMENT_TIMEOUT = int(os.getenv("DB_STATEMENT_TIMEOUT", "5000"))
+
+# Driver asynchrone équivalent à chaque driver synchrone
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Convertit une URL SQLAlchemy synchrone en URL pour le driver asynchrone.
+    ex: "mysql+pymysql://root:@localhost/dactylogame" -> "mysql+aiomysql://root:@localhost/dactylogame"
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Pas de driver asynchrone connu pour {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+IS_SQLITE = make_url(DATABASE_URL).get_backend_name() == "sqlite"
+
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """
+    Options de create_engine / create_async_engine selon la base et les réglages du pool.
+
+    Args:
+        url: URL de la base
+        is_async: True pour le moteur asynchrone
+
+    Returns:
+        Les arguments nommés à passer à create_engine
+    """
+    parsed = make_url(url)
+    options = {}
+
+    if parsed.get_backend_name() == "sqlite":
+        # SQLite en mémoire : une seule connexion partagée, on garde le pool choisi par SQLAlchemy
+        if parsed.database in (None, "", ":memory:"):
+            return {"connect_args": {"check_same_thread": False}}
+        # la connexion peut être utilisée par plusieurs threads (threadpool de FastAPI),
+        # timeout = attente max (en secondes) quand la base est verrouillée par une écriture
+        options["connect_args"] = {"check_same_thread": False, "timeout": DB_POOL_TIMEOUT}
+    else:
+        options["pool_recycle"] = DB_POOL_RECYCLE
+        options["pool_pre_ping"] = DB_POOL_PRE_PING
+
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT
+    )
+    return options
+
+
+def set_statement_timeout(dbapi_connection, connection_record) -> None:
+    """
+    Limite la durée des requêtes pour chaque nouvelle connexion MySQL / MariaDB.
+    MariaDB : max_statement_time (en secondes), MySQL : max_execution_time (en ms, SELECT uniquement).
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SET SESSION max_statement_time = %s" % (DB_STATEMENT_TIMEOUT / 1000))
+    except Exception:
+        cursor.execute("SET SESSION max_execution_time = %d" % DB_STATEMENT_TIMEOUT)
+    finally:
+        cursor.close()
+
+
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Moteur asynchrone pour les routes de jeu et de classement (pas de passage par le threadpool)
+async_engine = create_async_engine(to_async_url(DATABASE_URL), **engine_options(DATABASE_URL, is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if not IS_SQLITE and DB_STATEMENT_TIMEOUT > 0:
+    event.listen(engine, "connect", set_statement_timeout)
+    event.listen(async_engine.sync_engine, "connect", set_statement_timeout)
+
 Base = declarative_base() # permettra de créer les modèles
 
 # Models SQLAlchemy
@@ -32,12 +129,18 @@ class User(Base):
 
 class GameSession(Base):
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        # purge des sessions abandonnées : WHERE is_completed = 0 AND expected_end_time < ...
+        Index("idx_purge", "is_completed", "expected_end_time"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
     session_token = Column(String(64), unique=True, nullable=False, index=True)
-    words_sequence = Column(Text, nullable=False)  # JSON stringifié des mots
-    seed = Column(String(32), nullable=False)
+    words_sequence = Column(Text, nullable=True)  # JSON stringifié des mots (anciennes parties uniquement)
+    seed = Column(String(32), nullable=False)  # les mots sont régénérés depuis (seed, words_version, words_count)
+    words_version = Column(String(16), nullable=True)  # version de la liste de mots utilisée
+    words_count = Column(Integer, nullable=False, default=50)
     start_time = Column(DateTime, default=datetime.now)
     expected_end_time = Column(DateTime, nullable=False)
     is_completed = Column(Boolean, default=False)
@@ -52,6 +155,12 @@ class GameSession(Base):
 
 class Score(Base):
     __tablename__ = "scores"
+    __table_args__ = (
+        # meilleur score d'un joueur : MAX(score) ... WHERE user_id = ? (lu directement dans l'index)
+        Index("idx_user_score", "user_id", "score"),
+        # historique d'un joueur : WHERE user_id = ? ORDER BY created_at DESC
+        Index("idx_user_created", "user_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)  # Nullable pour les joueurs anonymes
@@ -66,6 +175,58 @@ class Score(Base):
     game_session = relationship("GameSession", back_populates="score", foreign_keys="GameSession.score_id")
 
 
+# Identifiant de la ligne "Inconnu" de best_scores (regroupe tous les joueurs anonymes)
+ANONYMOUS_PLAYER_ID = 0
+
+
+class BestScore(Base):
+    """Meilleur score de chaque joueur, mis à jour par end_game (le classement ne lit que cette table)"""
+    __tablename__ = "best_scores"
+    __table_args__ = (
+        # classement : ORDER BY best_score DESC, achieved_at, player_id LIMIT ... (sans tri)
+        # et rang : COUNT(DISTINCT best_score) WHERE best_score > ?
+        Index("idx_ranking", desc("best_score"), "achieved_at", "player_id"),
+    )
+    
+    player_id = Column(Integer, primary_key=True, autoincrement=False)  # = user_id, ou ANONYMOUS_PLAYER_ID
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True, unique=True)  # NULL pour "Inconnu"
+    best_score = Column(Integer, nullable=False, default=0)
+    achieved_at = Column(DateTime, default=datetime.now)
+    
+    # Relations
+    user = relationship("User")
+
+
+class PeriodBestScore(Base):
+    """Meilleur score de chaque joueur par jour / par semaine, mis à jour par end_game (classements par période)"""
+    __tablename__ = "period_best_scores"
+    __table_args__ = (
+        # classement d'une période : WHERE period = ? AND period_start = ? ORDER BY best_score DESC, ... (sans tri)
+        Index("idx_period_ranking", "period", "period_start", desc("best_score"), "achieved_at", "player_id"),
+    )
+    
+    period = Column(String(8), primary_key=True)  # "day" ou "week"
+    period_start = Column(Date, primary_key=True)  # le jour, ou le lundi de la semaine
+    player_id = Column(Integer, primary_key=True, autoincrement=False)  # = user_id, ou ANONYMOUS_PLAYER_ID
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)  # NULL pour "Inconnu"
+    best_score = Column(Integer, nullable=False, default=0)
+    achieved_at = Column(DateTime, default=datetime.now)
+
+
+class PlayerStats(Base):
+    """Statistiques cumulées de chaque joueur connecté, mises à jour par end_game (lues par /api/me/stats)"""
+    __tablename__ = "player_stats"
+    
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, autoincrement=False)
+    games_played = Column(Integer, nullable=False, default=0)
+    total_score = Column(Integer, nullable=False, default=0)
+    best_score = Column(Integer, nullable=False, default=0)
+    total_correct = Column(Integer, nullable=False, default=0)
+    total_wrong = Column(Integer, nullable=False, default=0)
+    total_duration = Column(Integer, nullable=False, default=0, comment="Durée totale de jeu en secondes")
+    last_played_at = Column(DateTime, nullable=True)
+
+
 # Fonction pour obtenir une session de BDD
 def get_db():
     db = SessionLocal()
@@ -73,3 +234,14 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# Fonction pour obtenir une session de BDD asynchrone
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Création des tables (utile avec SQLite en local, la base MySQL est créée avec dactylogame.sql)
+def create_tables():
+    Base.metadata.create_all(bind=engine)
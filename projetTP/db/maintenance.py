@@ -0,0 +1,185 @@
+"""
+Tâches de maintenance de la base de données, lancées en arrière-plan avec l'application.
+
+purge_expired_sessions supprime les parties abandonnées (jamais terminées) par petits lots
+sur la clé primaire, avec une pause entre deux lots : on évite ainsi un gros DELETE qui
+verrouillerait game_sessions pendant longtemps (et bloquerait /api/check-word).
+
+purge_old_leaderboards supprime les meilleurs scores des jours et des semaines passés
+(period_best_scores), une période à la fois.
+
+La boucle (run_maintenance) tourne dans chaque processus : elle y lance aussi les tâches
+propres au processus, comme l'écriture des compteurs des parties expirées du cache mémoire.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Optional, Sequence
+from sqlalchemy import select, delete
+from db.database import AsyncSessionLocal, GameSession, PeriodBestScore
+from game.leaderboard import PERIOD_BUCKETS
+
+logger = logging.getLogger("dactylogame.maintenance")
+
+# Intervalle (en secondes) entre deux tours de la boucle de maintenance (inférieur à ACTIVE_GAME_TTL)
+MAINTENANCE_INTERVAL = float(os.getenv("MAINTENANCE_INTERVAL", "30"))
+# Intervalle (en secondes) entre deux purges, 0 pour désactiver la purge automatique
+PURGE_INTERVAL = int(os.getenv("PURGE_INTERVAL", "300"))
+# Nombre de sessions supprimées par lot
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", "500"))
+# Pause (en secondes) entre deux lots, pour limiter la charge sur la BDD
+PURGE_BATCH_PAUSE = float(os.getenv("PURGE_BATCH_PAUSE", "0.2"))
+# Une session non terminée est supprimée une fois sa fin prévue dépassée de cette marge
+PURGE_GRACE = timedelta(hours=1)
+# Nombre de jours pendant lesquels on garde les classements des jours / semaines passés
+LEADERBOARD_RETENTION_DAYS = int(os.getenv("LEADERBOARD_RETENTION_DAYS", "14"))
+
+# Compte-rendu de la dernière purge (exposé par /api/internal/stats)
+last_purge_report: Optional[dict] = None
+
+
+async def purge_expired_sessions(
+    batch_size: int = PURGE_BATCH_SIZE,
+    pause: float = PURGE_BATCH_PAUSE
+) -> dict:
+    """
+    Supprime les sessions de jeu non terminées dont la fin prévue est dépassée.
+    Chaque lot est une transaction courte :
+        SELECT id FROM game_sessions
+        WHERE is_completed = 0 AND expected_end_time < :limite AND id > :dernier_id
+        ORDER BY id LIMIT :batch_size
+        puis DELETE ... WHERE id IN (...)
+
+    Args:
+        batch_size: Nombre de sessions supprimées par lot
+        pause: Pause (en secondes) entre deux lots
+
+    Returns:
+        Le compte-rendu de la purge : {'deleted', 'batches', 'duration_ms', 'finished_at'}
+    """
+    global last_purge_report
+
+    started = time.monotonic()
+    cutoff = datetime.now() - PURGE_GRACE
+    deleted = 0
+    batches = 0
+    last_id = 0
+
+    while True:
+        async with AsyncSessionLocal() as db:
+            ids = (await db.scalars(
+                select(GameSession.id)
+                .where(
+                    GameSession.is_completed == False,
+                    GameSession.expected_end_time < cutoff,
+                    GameSession.id > last_id
+                )
+                .order_by(GameSession.id)
+                .limit(batch_size)
+            )).all()
+
+            if not ids:
+                break
+
+            result = await db.execute(
+                delete(GameSession).where(GameSession.id.in_(ids), GameSession.is_completed == False)
+            )
+            await db.commit()
+
+        deleted += result.rowcount
+        batches += 1
+        last_id = ids[-1]
+
+        if len(ids) < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    last_purge_report = {
+        'deleted': deleted,
+        'batches': batches,
+        'duration_ms': round((time.monotonic() - started) * 1000, 1),
+        'finished_at': datetime.now().isoformat(timespec='seconds')
+    }
+    logger.info("Purge des sessions abandonnées : %(deleted)s lignes en %(duration_ms)s ms", last_purge_report)
+    return last_purge_report
+
+
+async def purge_old_leaderboards(
+    retention_days: int = LEADERBOARD_RETENTION_DAYS,
+    pause: float = PURGE_BATCH_PAUSE
+) -> int:
+    """
+    Supprime les classements des jours et des semaines commencés il y a plus de retention_days jours.
+    Chaque période est supprimée dans sa propre transaction courte (via l'index (period, period_start, ...)) :
+        DELETE FROM period_best_scores WHERE period = :period AND period_start = :debut
+
+    Args:
+        retention_days: Nombre de jours de classements gardés
+        pause: Pause (en secondes) entre deux périodes
+
+    Returns:
+        Le nombre de lignes supprimées
+    """
+    cutoff = date.today() - timedelta(days=retention_days)
+    deleted = 0
+
+    async with AsyncSessionLocal() as db:
+        periods = []
+        for period in PERIOD_BUCKETS:
+            # SELECT DISTINCT period_start FROM period_best_scores WHERE period = :period AND period_start < :limite
+            periods += [(period, start) for start in (await db.scalars(
+                select(PeriodBestScore.period_start)
+                .where(PeriodBestScore.period == period, PeriodBestScore.period_start < cutoff)
+                .distinct()
+            )).all()]
+
+    for period, start in periods:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(PeriodBestScore)
+                .where(PeriodBestScore.period == period, PeriodBestScore.period_start == start)
+            )
+            await db.commit()
+        deleted += result.rowcount
+        await asyncio.sleep(pause)
+
+    if deleted:
+        logger.info("Purge des anciens classements : %s lignes (%s périodes)", deleted, len(periods))
+    return deleted
+
+
+async def run_maintenance(jobs: Sequence[Callable[[], Awaitable[None]]] = (), interval: float = MAINTENANCE_INTERVAL) -> None:
+    """
+    Boucle de maintenance lancée au démarrage de l'application (annulée à l'arrêt).
+    A chaque tour : les tâches propres au processus (jobs, ex: écrire en BDD les compteurs
+    des parties expirées du cache), puis les purges si PURGE_INTERVAL secondes se sont
+    écoulées depuis les dernières (PURGE_INTERVAL = 0 : pas de purge dans ce processus).
+
+    Args:
+        jobs: Fonctions asynchrones appelées à chaque tour
+        interval: Intervalle (en secondes) entre deux tours
+    """
+    last_purge = None
+    while True:
+        for job in jobs:
+            try:
+                await job()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erreur pendant la tâche de maintenance %s", getattr(job, '__name__', job))
+
+        if PURGE_INTERVAL > 0 and (last_purge is None or time.monotonic() - last_purge >= PURGE_INTERVAL):
+            last_purge = time.monotonic()
+            try:
+                await purge_expired_sessions()
+                await purge_old_leaderboards()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # une erreur de purge ne doit pas arrêter la boucle (BDD momentanément indisponible...)
+                logger.exception("Erreur pendant la purge des sessions abandonnées / des anciens classements")
+        await asyncio.sleep(interval)
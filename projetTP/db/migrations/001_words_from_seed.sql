@@ -0,0 +1,6 @@
+-- Les mots d'une partie sont régénérés depuis (seed, words_version, words_count)
+-- words_sequence n'est plus rempli que pour les anciennes parties
+ALTER TABLE `game_sessions`
+  MODIFY `words_sequence` text DEFAULT NULL COMMENT 'Anciennes parties uniquement',
+  ADD COLUMN `words_version` varchar(16) DEFAULT NULL COMMENT 'Version de la liste de mots' AFTER `seed`,
+  ADD COLUMN `words_count` int(11) NOT NULL DEFAULT 50 AFTER `words_version`;
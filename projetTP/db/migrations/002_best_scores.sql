@@ -0,0 +1,17 @@
+-- Table des meilleurs scores par joueur, lue par le classement
+CREATE TABLE `best_scores` (
+  `player_id` int(11) NOT NULL COMMENT 'user_id, ou 0 pour les joueurs anonymes',
+  `user_id` int(11) DEFAULT NULL,
+  `best_score` int(11) NOT NULL DEFAULT 0,
+  `achieved_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`player_id`),
+  UNIQUE KEY `user_id` (`user_id`),
+  KEY `idx_best_score` (`best_score`),
+  CONSTRAINT `best_scores_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Remplissage à partir des scores déjà enregistrés
+INSERT INTO `best_scores` (`player_id`, `user_id`, `best_score`, `achieved_at`)
+SELECT COALESCE(`user_id`, 0), `user_id`, MAX(`score`), MAX(`created_at`)
+FROM `scores`
+GROUP BY `user_id`;
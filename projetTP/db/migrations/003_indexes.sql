@@ -0,0 +1,17 @@
+-- Index composites adaptés aux requêtes du classement, de l'historique et de la purge
+
+-- Classement : ORDER BY best_score DESC, achieved_at, player_id sans tri,
+-- et rang : COUNT(DISTINCT best_score) WHERE best_score > ?
+ALTER TABLE `best_scores`
+  ADD KEY `idx_ranking` (`best_score` DESC, `achieved_at`, `player_id`),
+  DROP KEY `idx_best_score`;
+
+-- Purge des sessions abandonnées : WHERE is_completed = 0 AND expected_end_time < ?
+ALTER TABLE `game_sessions`
+  ADD KEY `idx_purge` (`is_completed`, `expected_end_time`);
+
+-- Meilleur score et historique d'un joueur (idx_user_score remplace idx_user_id pour la clé étrangère)
+ALTER TABLE `scores`
+  ADD KEY `idx_user_score` (`user_id`, `score`),
+  ADD KEY `idx_user_created` (`user_id`, `created_at`),
+  DROP KEY `idx_user_id`;
@@ -0,0 +1,20 @@
+-- Statistiques cumulées de chaque joueur connecté, lues par /api/me/stats
+CREATE TABLE `player_stats` (
+  `user_id` int(11) NOT NULL,
+  `games_played` int(11) NOT NULL DEFAULT 0,
+  `total_score` int(11) NOT NULL DEFAULT 0,
+  `best_score` int(11) NOT NULL DEFAULT 0,
+  `total_correct` int(11) NOT NULL DEFAULT 0,
+  `total_wrong` int(11) NOT NULL DEFAULT 0,
+  `total_duration` int(11) NOT NULL DEFAULT 0 COMMENT 'Durée totale de jeu en secondes',
+  `last_played_at` timestamp NULL DEFAULT NULL,
+  PRIMARY KEY (`user_id`),
+  CONSTRAINT `player_stats_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Remplissage à partir des scores déjà enregistrés (une seule fois, via l'index (user_id, created_at))
+INSERT INTO `player_stats` (`user_id`, `games_played`, `total_score`, `best_score`, `total_correct`, `total_wrong`, `total_duration`, `last_played_at`)
+SELECT `user_id`, COUNT(*), SUM(`score`), MAX(`score`), SUM(`words_correct`), SUM(`words_wrong`), SUM(`duration`), MAX(`created_at`)
+FROM `scores`
+WHERE `user_id` IS NOT NULL
+GROUP BY `user_id`;
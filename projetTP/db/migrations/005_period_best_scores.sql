@@ -0,0 +1,27 @@
+-- Meilleurs scores par jour et par semaine, lus par les classements par période (/api/ranking?period=day|week)
+-- Les périodes passées sont supprimées par la maintenance (voir LEADERBOARD_RETENTION_DAYS)
+CREATE TABLE `period_best_scores` (
+  `period` varchar(8) NOT NULL COMMENT 'day ou week',
+  `period_start` date NOT NULL COMMENT 'Le jour, ou le lundi de la semaine',
+  `player_id` int(11) NOT NULL COMMENT 'user_id, ou 0 pour les joueurs anonymes',
+  `user_id` int(11) DEFAULT NULL,
+  `best_score` int(11) NOT NULL DEFAULT 0,
+  `achieved_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`period`, `period_start`, `player_id`),
+  KEY `idx_period_ranking` (`period`, `period_start`, `best_score` DESC, `achieved_at`, `player_id`),
+  KEY `user_id` (`user_id`),
+  CONSTRAINT `period_best_scores_ibfk_1` FOREIGN KEY (`user_id`) REFERENCES `users` (`id`) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Remplissage du jour et de la semaine en cours à partir des scores déjà enregistrés (via l'index created_at)
+INSERT INTO `period_best_scores` (`period`, `period_start`, `player_id`, `user_id`, `best_score`, `achieved_at`)
+SELECT 'day', CURDATE(), COALESCE(`user_id`, 0), `user_id`, MAX(`score`), MAX(`created_at`)
+FROM `scores`
+WHERE `created_at` >= CURDATE()
+GROUP BY `user_id`;
+
+INSERT INTO `period_best_scores` (`period`, `period_start`, `player_id`, `user_id`, `best_score`, `achieved_at`)
+SELECT 'week', CURDATE() - INTERVAL WEEKDAY(CURDATE()) DAY, COALESCE(`user_id`, 0), `user_id`, MAX(`score`), MAX(`created_at`)
+FROM `scores`
+WHERE `created_at` >= CURDATE() - INTERVAL WEEKDAY(CURDATE()) DAY
+GROUP BY `user_id`;
@@ -0,0 +1,118 @@
+"""
+Pool de connexions instrumenté pour l'application Dactylogame.
+
+TimedQueuePool et TimedAsyncQueuePool sont les pools par défaut de SQLAlchemy
+(QueuePool pour le moteur synchrone, AsyncAdaptedQueuePool pour le moteur asynchrone)
+qui mesurent en plus le temps d'attente pour obtenir une connexion : quand toutes les
+connexions sont prises, une requête attend qu'une connexion soit rendue (jusqu'à pool_timeout).
+
+Les compteurs sont exposés par /api/internal/stats (voir pool_stats). Le temps d'attente
+récent (moyenne glissante, voir recent_wait) sert au délestage des routes de jeu.
+"""
+
+import math
+import threading
+import time
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool, AsyncAdaptedQueuePool
+
+
+# Constante de temps (en secondes) de la moyenne glissante du temps d'attente
+RECENT_WAIT_WINDOW = 5.0
+
+
+class PoolMetrics:
+    """Temps d'attente des demandes de connexion (checkout) d'un pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0  # secondes
+        self.max_wait = 0.0  # secondes
+        # moyenne glissante (exponentielle, sur RECENT_WAIT_WINDOW secondes) et date de sa dernière mise à jour
+        self._recent_wait = 0.0
+        self._recent_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if timed_out:
+                self.timeouts += 1
+            now = time.monotonic()
+            # le poids d'une attente dépend du temps écoulé depuis la précédente
+            weight = 1 - math.exp(-(now - self._recent_at) / RECENT_WAIT_WINDOW)
+            self._recent_wait += (wait - self._recent_wait) * weight
+            self._recent_at = now
+
+    def recent_wait(self) -> float:
+        """Temps d'attente moyen récent (en secondes), qui redescend vers 0 quand le pool n'est plus sollicité"""
+        with self._lock:
+            return self._recent_wait * math.exp(-(time.monotonic() - self._recent_at) / RECENT_WAIT_WINDOW)
+
+    def stats(self) -> dict:
+        return {
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'avg_wait_ms': round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            'max_wait_ms': round(self.max_wait * 1000, 3),
+            'recent_wait_ms': round(self.recent_wait() * 1000, 3)
+        }
+
+
+class _TimedPoolMixin:
+    """Mesure la durée de _do_get (obtention d'une connexion, attente comprise)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_stats(pool: Pool) -> dict:
+    """
+    Occupation et temps d'attente d'un pool de connexions.
+
+    Args:
+        pool: Le pool du moteur (engine.pool)
+
+    Returns:
+        {'size', 'checked_out', 'overflow', 'checked_in', 'checkouts', 'timeouts', 'avg_wait_ms', 'max_wait_ms', 'recent_wait_ms'}
+        (seulement le type du pool s'il n'est pas instrumenté, ex: SQLite en mémoire)
+    """
+    if not isinstance(pool, _TimedPoolMixin):
+        return {'pool': type(pool).__name__}
+
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'overflow': max(pool.overflow(), 0),
+        'checked_in': pool.checkedin(),
+        **pool.metrics.stats()
+    }
+
+
+def recent_wait(pool: Pool) -> float:
+    """Temps d'attente moyen récent d'une connexion (en secondes), 0 si le pool n'est pas instrumenté"""
+    if not isinstance(pool, _TimedPoolMixin):
+        return 0.0
+    return pool.metrics.recent_wait()
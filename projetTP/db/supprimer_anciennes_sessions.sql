@@ -1,7 +1,13 @@
+-- La purge est faite automatiquement par l'application (db/maintenance.py),
+-- ce script reste utile pour une purge manuelle.
+
 -- à titre de visualisation seulement
 SELECT * FROM game_sessions
-WHERE start_time < NOW() - INTERVAL 1 DAY AND is_completed = 0;
+WHERE is_completed = 0 AND expected_end_time < NOW() - INTERVAL 1 HOUR;
 
--- Suppression des anciennes sessions de jeu incomplètes
+-- Suppression des anciennes sessions de jeu incomplètes, par lots de 500
+-- (relancer tant que des lignes sont supprimées) pour ne pas verrouiller la table longtemps
 DELETE FROM game_sessions
-WHERE start_time < NOW() - INTERVAL 1 DAY AND is_completed = 0;
\ No newline at end of file
+WHERE is_completed = 0 AND expected_end_time < NOW() - INTERVAL 1 HOUR
+ORDER BY id
+LIMIT 500;
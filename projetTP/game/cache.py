@@ -0,0 +1,150 @@
+"""
+Cache mémoire des parties en cours pour l'application Dactylogame.
+
+Pendant une partie, /api/check-word est appelé une fois par mot tapé. Pour éviter
+une requête + un commit en BDD à chaque mot, on garde en mémoire :
+- la suite de mots attendue
+- les compteurs de mots corrects / incorrects
+
+Les compteurs sont écrits en BDD en une seule fois (write-behind) :
+- à la fin de la partie (end_game)
+- ou quand la partie expire du cache (TTL, repoussé à chaque mot vérifié), par la boucle
+  de maintenance (db/maintenance.py)
+- et pour toutes les parties du cache à l'arrêt de l'application
+
+Avec plusieurs processus (serve.py), deux requêtes d'une même partie peuvent arriver
+sur deux processus différents : ACTIVE_GAME_WRITE_THROUGH=1 écrit alors les compteurs
+en BDD à chaque vérification (la suite de mots reste en cache).
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Durée de vie d'une partie dans le cache sans activité (30s de jeu + une large marge)
+ACTIVE_GAME_TTL = 120
+
+# Écrit les compteurs en BDD à chaque vérification (nécessaire avec plusieurs processus)
+ACTIVE_GAME_WRITE_THROUGH = os.getenv("ACTIVE_GAME_WRITE_THROUGH", "0") == "1"
+
+
+@dataclass
+class ActiveGame:
+    """État d'une partie en cours"""
+    session_token: str
+    user_id: Optional[int]
+    words: tuple[str, ...]
+    # compteurs déjà présents en BDD au moment de la mise en cache
+    words_correct_count: int = 0
+    words_wrong_count: int = 0
+    # compteurs pas encore écrits en BDD
+    pending_correct: int = 0
+    pending_wrong: int = 0
+    expires_at: float = field(default_factory=lambda: time.monotonic() + ACTIVE_GAME_TTL)
+
+    @property
+    def total_correct(self) -> int:
+        return self.words_correct_count + self.pending_correct
+
+    @property
+    def total_wrong(self) -> int:
+        return self.words_wrong_count + self.pending_wrong
+
+
+class ActiveGameCache:
+    """Cache des parties en cours, indexé par session_token, avec expiration (TTL)"""
+
+    def __init__(self, ttl: float = ACTIVE_GAME_TTL):
+        self.ttl = ttl
+        # dict garde l'ordre d'insertion : une partie est remise à la fin à chaque accès,
+        # les parties inactives depuis le plus longtemps (donc les premières à expirer) sont au début
+        self._games: dict[str, ActiveGame] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def put(self, game: ActiveGame) -> None:
+        """Ajoute (ou remplace) une partie dans le cache"""
+        game.expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            self._games.pop(game.session_token, None)
+            self._games[game.session_token] = game
+
+    def get(self, session_token: str) -> Optional[ActiveGame]:
+        """Retourne la partie si elle est dans le cache et n'a pas expiré (et repousse son expiration)"""
+        now = time.monotonic()
+        with self._lock:
+            game = self._games.get(session_token)
+            if game is None or game.expires_at <= now:
+                return None
+            game.expires_at = now + self.ttl
+            # la partie passe en fin de dict pour garder l'ordre d'expiration
+            self._games[session_token] = self._games.pop(session_token)
+            return game
+
+    def record(self, game: ActiveGame, is_correct: bool) -> None:
+        """Incrémente les compteurs en mémoire (aucun accès BDD)"""
+        with self._lock:
+            if is_correct:
+                game.pending_correct += 1
+            else:
+                game.pending_wrong += 1
+
+    def record_many(self, game: ActiveGame, nb_correct: int, nb_wrong: int) -> None:
+        """Incrémente les compteurs en mémoire en une seule fois (vérification par lot)"""
+        with self._lock:
+            game.pending_correct += nb_correct
+            game.pending_wrong += nb_wrong
+
+    def take_pending(self, game: ActiveGame) -> tuple[int, int]:
+        """
+        Retire les compteurs en attente d'une partie, pour les écrire en BDD.
+        Ils sont ajoutés aux compteurs déjà en BDD.
+
+        Returns:
+            (mots corrects, mots incorrects) en attente
+        """
+        with self._lock:
+            pending = (game.pending_correct, game.pending_wrong)
+            game.words_correct_count += game.pending_correct
+            game.words_wrong_count += game.pending_wrong
+            game.pending_correct = game.pending_wrong = 0
+        return pending
+
+    def pop(self, session_token: str) -> Optional[ActiveGame]:
+        """Retire une partie du cache (même expirée) pour écrire ses compteurs en BDD"""
+        with self._lock:
+            return self._games.pop(session_token, None)
+
+    def pop_expired(self) -> list[ActiveGame]:
+        """
+        Retire les parties expirées du cache.
+
+        Returns:
+            Les parties expirées, dont les compteurs doivent encore être écrits en BDD
+        """
+        now = time.monotonic()
+        expired = []
+        with self._lock:
+            for token, game in self._games.items():
+                if game.expires_at > now:
+                    break
+                expired.append(game)
+            for game in expired:
+                del self._games[game.session_token]
+        return expired
+
+    def pop_all(self) -> list[ActiveGame]:
+        """
+        Vide le cache (arrêt de l'application).
+
+        Returns:
+            Toutes les parties, dont les compteurs doivent encore être écrits en BDD
+        """
+        with self._lock:
+            games = list(self._games.values())
+            self._games.clear()
+        return games
@@ -0,0 +1,364 @@
+"""
+Gestion du classement pour l'application Dactylogame.
+
+Le meilleur score de chaque joueur est gardé dans la table best_scores, mise à jour
+par end_game dans la même transaction que l'écriture du score. Le classement ne lit
+donc que cette table (une ligne par joueur) et non toute la table scores.
+
+Les classements du jour et de la semaine fonctionnent de la même façon avec la table
+period_best_scores : une ligne par joueur et par période (jour, ou semaine commençant
+le lundi), mise à jour dans la même transaction. Le classement d'une période ne lit que
+les lignes de la période en cours (index (period, period_start, best_score DESC, ...)) :
+il coûte autant que le classement global, quel que soit l'historique. Les périodes passées
+sont supprimées par la maintenance (db/maintenance.py).
+
+Les pages du classement sont ensuite gardées en mémoire (RankingCache), déjà encodées
+en JSON, jusqu'au prochain record battu, ou au plus RANKING_CACHE_MAX_AGE secondes (pour
+voir les records enregistrés par les autres processus).
+"""
+
+import hashlib
+import time
+from bisect import bisect_right
+from datetime import date, datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+from sqlalchemy import select, case, func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import BestScore, PeriodBestScore, User, ANONYMOUS_PLAYER_ID
+from web.responses import dumps
+
+# Périodes des classements : depuis toujours (best_scores), du jour et de la semaine (period_best_scores)
+PERIODS = ('all', 'day', 'week')
+PERIOD_BUCKETS = ('day', 'week')
+
+
+class RankingRow(NamedTuple):
+    """Une ligne du classement"""
+    rank: int
+    user_id: Optional[int]
+    username: str
+    best_score: int
+
+
+def period_start(period: str, when: Optional[datetime] = None) -> Optional[date]:
+    """
+    Début de la période qui contient une date : le jour même, ou le lundi de la semaine.
+
+    Args:
+        period: "all", "day" ou "week"
+        when: La date (maintenant par défaut)
+
+    Returns:
+        Le premier jour de la période, ou None pour le classement global
+    """
+    if period == 'all':
+        return None
+    day = (when or datetime.now()).date()
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def _board(period: str, start: Optional[date]):
+    """Table du classement d'une période, et les conditions pour ne lire que la période voulue"""
+    if period == 'all':
+        return BestScore, ()
+    return PeriodBestScore, (PeriodBestScore.period == period, PeriodBestScore.period_start == start)
+
+
+async def _raise_best_score(db: AsyncSession, model, key: dict, user_id: Optional[int], score: int, achieved_at: datetime) -> bool:
+    """
+    Crée ou relève une ligne de meilleur score, en une seule requête (sans commit) :
+        SQLite : INSERT ... ON CONFLICT (clé) DO UPDATE SET ... WHERE best_score < excluded.best_score
+        MySQL :  INSERT ... ON DUPLICATE KEY UPDATE achieved_at = ..., best_score = GREATEST(best_score, VALUES(best_score))
+    L'upsert est atomique : deux parties terminées en même temps par le même joueur ne
+    peuvent ni perdre un record ni échouer sur la clé primaire.
+
+    Returns:
+        True si la ligne a été créée ou relevée. Sur MySQL, une ligne créée renvoie le même
+        rowcount (1, CLIENT_FOUND_ROWS) qu'une ligne inchangée : seul un record battu compte,
+        une nouvelle ligne apparaît dans le cache du classement après RANKING_CACHE_MAX_AGE
+        au plus (comme les records des autres processus)
+    """
+    values = dict(key, user_id=user_id, best_score=score, achieved_at=achieved_at)
+    if db.get_bind().dialect.name == 'mysql':
+        statement = mysql_insert(model).values(**values)
+        new = statement.inserted
+        # MySQL applique les affectations dans l'ordre : achieved_at d'abord, tant que best_score est l'ancien
+        statement = statement.on_duplicate_key_update([
+            ('achieved_at', case((new.best_score > model.best_score, new.achieved_at), else_=model.achieved_at)),
+            ('best_score', func.greatest(model.best_score, new.best_score)),
+        ])
+        result = await db.execute(statement)
+        # 1 : ligne créée ou inchangée, 2 : ligne relevée
+        return result.rowcount == 2
+
+    statement = sqlite_insert(model).values(**values)
+    new = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[getattr(model, column) for column in key],
+        set_={'best_score': new.best_score, 'achieved_at': new.achieved_at},
+        where=model.best_score < new.best_score
+    )
+    result = await db.execute(statement)
+    # 0 : record non battu (la condition WHERE empêche la mise à jour)
+    return bool(result.rowcount)
+
+
+async def update_best_score(db: AsyncSession, user_id: Optional[int], score: int, achieved_at: datetime) -> list[str]:
+    """
+    Met à jour les meilleurs scores d'un joueur (global, du jour, de la semaine)
+    quand le nouveau score les bat (sans commit).
+    Les joueurs anonymes partagent une seule ligne "Inconnu".
+
+    Args:
+        db: Session de base de données asynchrone
+        user_id: L'id du joueur (None pour un joueur anonyme)
+        score: Le score de la partie
+        achieved_at: Date de la partie
+
+    Returns:
+        Les périodes ("all", "day", "week") où c'est un nouveau record personnel (liste vide sinon)
+    """
+    player_id = user_id if user_id is not None else ANONYMOUS_PLAYER_ID
+
+    records = []
+    if await _raise_best_score(db, BestScore, {'player_id': player_id}, user_id, score, achieved_at):
+        records.append('all')
+    for period in PERIOD_BUCKETS:
+        key = {'period': period, 'period_start': period_start(period, achieved_at), 'player_id': player_id}
+        if await _raise_best_score(db, PeriodBestScore, key, user_id, score, achieved_at):
+            records.append(period)
+    return records
+
+
+async def dense_rank(db: AsyncSession, score: int, period: str = 'all', start: Optional[date] = None) -> int:
+    """
+    Rang d'un score dans le classement (les joueurs avec le même score ont le même rang).
+    Le rang est 1 + le nombre de scores distincts plus élevés, compté via l'index sur best_score.
+
+    Args:
+        db: Session de base de données asynchrone
+        score: Le score dont on veut le rang
+        period: "all", "day" ou "week"
+        start: Début de la période (ignoré pour "all")
+
+    Returns:
+        Le rang (1 = premier)
+    """
+    model, in_period = _board(period, start)
+    # SELECT COUNT(DISTINCT best_score) FROM best_scores WHERE best_score > :score
+    higher = await db.scalar(
+        select(func.count(func.distinct(model.best_score))).where(*in_period, model.best_score > score)
+    )
+    return higher + 1
+
+
+async def get_ranking_page(
+    db: AsyncSession,
+    limit: int,
+    offset: int,
+    period: str = 'all',
+    start: Optional[date] = None
+) -> tuple[list[RankingRow], bool]:
+    """
+    Construit une page du classement, avec le rang de chaque joueur.
+
+    Args:
+        db: Session de base de données asynchrone
+        limit: Nombre de joueurs par page
+        offset: Nombre de joueurs à sauter
+        period: "all", "day" ou "week"
+        start: Début de la période (ignoré pour "all")
+
+    Returns:
+        (la page du classement, True s'il reste des joueurs après cette page)
+    """
+    model, in_period = _board(period, start)
+    # on demande une ligne de plus pour savoir s'il y a une page suivante
+    rows = (await db.execute(
+        select(model.user_id, User.username, model.best_score)
+        .outerjoin(User, User.id == model.user_id)
+        .where(*in_period)
+        .order_by(model.best_score.desc(), model.achieved_at, model.player_id)
+        .limit(limit + 1)
+        .offset(offset)
+    )).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], False
+
+    # rang du premier joueur de la page, puis les gens avec le même score sont placés dans la même place
+    rank = await dense_rank(db, rows[0].best_score, period, start)
+    last_score = rows[0].best_score
+    ranked = []
+    for row in rows:
+        if row.best_score != last_score:
+            rank += 1
+            last_score = row.best_score
+        # les joueurs sans id sont marqués avec un username "Inconnu"
+        username = row.username if row.user_id is not None else 'Inconnu'
+        ranked.append(RankingRow(rank, row.user_id, username, int(row.best_score)))
+
+    return ranked, has_more
+
+
+# Durée maximale (en secondes) pendant laquelle une page du classement est servie depuis la mémoire
+RANKING_CACHE_MAX_AGE = 10
+# Nombre maximum de pages (limit, offset) gardées en mémoire
+RANKING_CACHE_MAX_PAGES = 64
+
+
+class RankingPage:
+    """Une page du classement déjà calculée, et encodée en JSON une seule fois"""
+
+    def __init__(self, rows: list[RankingRow], has_more: bool, start: Optional[date] = None):
+        self.rows = rows
+        self.has_more = has_more
+        self.start = start
+        self.loaded_at = time.monotonic()
+        # date de calcul arrondie à la seconde (format des en-têtes HTTP)
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        # la liste au format de la réponse : [{"rank": 1, "user_id": 10, "username": "jdk", "best_score": 23}, ...]
+        self.json = dumps([row._asdict() for row in rows])
+        # empreinte du contenu, utilisée pour l'ETag
+        self.digest = hashlib.sha1(self.json).hexdigest()[:16]
+
+
+class RankingCache:
+    """
+    Cache mémoire des classements (global, du jour, de la semaine).
+    - les pages (période, début de la période, limit, offset) déjà calculées
+    - la liste des scores distincts de chaque période, pour calculer le rang d'un joueur sans requête de comptage
+    Une nouvelle période (jour ou semaine) a une autre clé : ses pages sont calculées au premier appel.
+    Le cache d'une période est vidé par invalidate() quand un record personnel y est battu.
+    """
+
+    def __init__(self, max_age: float = RANKING_CACHE_MAX_AGE, max_pages: int = RANKING_CACHE_MAX_PAGES):
+        self.max_age = max_age
+        self.max_pages = max_pages
+        self._pages: dict[tuple[str, Optional[date], int, int], RankingPage] = {}
+        # (période, début) -> (scores distincts triés par ordre croissant, date de chargement)
+        self._distinct_scores: dict[tuple[str, Optional[date]], tuple[list[int], float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, periods: Optional[list[str]] = None) -> None:
+        """
+        Vide le cache (appelé après un nouveau record personnel).
+
+        Args:
+            periods: Les périodes dont le classement a changé (toutes par défaut)
+        """
+        if periods is None:
+            self._pages.clear()
+            self._distinct_scores.clear()
+            return
+        for key in [key for key in self._pages if key[0] in periods]:
+            del self._pages[key]
+        for key in [key for key in self._distinct_scores if key[0] in periods]:
+            del self._distinct_scores[key]
+
+    def _is_fresh(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at < self.max_age
+
+    async def get_page(self, db: AsyncSession, limit: int, offset: int, period: str = 'all') -> RankingPage:
+        """
+        Retourne une page du classement de la période en cours depuis le cache, ou la calcule si besoin.
+
+        Args:
+            db: Session de base de données asynchrone
+            limit: Nombre de joueurs par page
+            offset: Nombre de joueurs à sauter
+            period: "all", "day" ou "week"
+
+        Returns:
+            La page du classement
+        """
+        start = period_start(period)
+        key = (period, start, limit, offset)
+        page = self._pages.get(key)
+        if page is not None and self._is_fresh(page.loaded_at):
+            self.hits += 1
+            return page
+
+        self.misses += 1
+        rows, has_more = await get_ranking_page(db, limit, offset, period, start)
+        page = RankingPage(rows, has_more, start)
+
+        if len(self._pages) >= self.max_pages:
+            # on retire la page la plus ancienne
+            self._pages.pop(next(iter(self._pages)))
+        self._pages[key] = page
+        return page
+
+    async def rank_of(self, db: AsyncSession, score: int, period: str = 'all', start: Optional[date] = None) -> int:
+        """
+        Rang d'un score, calculé en mémoire à partir de la liste des scores distincts.
+        (il y a peu de scores distincts : un score est un nombre de mots tapés en 30s)
+
+        Args:
+            db: Session de base de données asynchrone
+            score: Le score dont on veut le rang
+            period: "all", "day" ou "week"
+            start: Début de la période (ignoré pour "all")
+
+        Returns:
+            Le rang (1 = premier)
+        """
+        cached = self._distinct_scores.get((period, start))
+        if cached is None or not self._is_fresh(cached[1]):
+            model, in_period = _board(period, start)
+            # SELECT DISTINCT best_score FROM best_scores ORDER BY best_score
+            scores = list((await db.scalars(
+                select(model.best_score).where(*in_period).distinct().order_by(model.best_score)
+            )).all())
+            cached = self._distinct_scores[(period, start)] = (scores, time.monotonic())
+
+        # nombre de scores distincts strictement plus élevés + 1
+        scores = cached[0]
+        return len(scores) - bisect_right(scores, score) + 1
+
+
+async def get_player_position(
+    db: AsyncSession,
+    user: User,
+    cache: Optional[RankingCache] = None,
+    period: str = 'all'
+) -> dict:
+    """
+    Position d'un joueur connecté dans le classement de la période en cours (lecture par clé
+    primaire + comptage indexé, ou calcul en mémoire si un RankingCache est fourni).
+
+    Args:
+        db: Session de base de données asynchrone
+        user: Le joueur connecté
+        cache: Le cache du classement (optionnel)
+        period: "all", "day" ou "week"
+
+    Returns:
+        {'rank', 'user_id', 'username', 'best_score'} (rank vaut None si le joueur n'a pas encore de score)
+    """
+    start = period_start(period)
+    if period == 'all':
+        best = await db.get(BestScore, user.id)
+    else:
+        best = await db.get(PeriodBestScore, {'period': period, 'period_start': start, 'player_id': user.id})
+    if best is None: # si le joueur n'a pas encore de score (sur la période)
+        return {'rank': None, 'user_id': user.id, 'username': user.username or 'Inconnu', 'best_score': 0}
+
+    if cache is not None:
+        rank = await cache.rank_of(db, best.best_score, period, start)
+    else:
+        rank = await dense_rank(db, best.best_score, period, start)
+
+    return {
+        'rank': rank,
+        'user_id': user.id,
+        'username': user.username,
+        'best_score': int(best.best_score)
+    }
@@ -0,0 +1,199 @@
+"""
+Statistiques des joueurs pour l'application Dactylogame.
+
+Les totaux de chaque joueur connecté (parties jouées, scores, mots corrects / incorrects,
+temps de jeu) sont gardés dans une ligne de player_stats, mise à jour par end_game dans
+la même transaction que l'écriture du score : /api/me/stats lit cette seule ligne au lieu
+de parcourir tous les scores du joueur.
+
+L'historique des parties est paginé par curseur (created_at, id) sur l'index
+(user_id, created_at) de scores : chaque page est une lecture d'index, quelle que soit
+sa position dans l'historique (contrairement à OFFSET).
+"""
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import select, case, and_, or_
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import PlayerStats, Score
+
+# Nombre de parties par page d'historique (par défaut)
+HISTORY_PAGE_SIZE = 10
+
+
+async def update_player_stats(
+    db: AsyncSession,
+    user_id: int,
+    score: int,
+    words_correct: int,
+    words_wrong: int,
+    duration: int,
+    played_at: datetime
+) -> None:
+    """
+    Ajoute une partie terminée aux statistiques d'un joueur (sans commit).
+    Une seule requête, atomique, avec des incréments côté SQL (pas de lecture préalable) :
+        SQLite : INSERT ... ON CONFLICT (user_id) DO UPDATE SET games_played = games_played + 1, ...
+        MySQL :  INSERT ... ON DUPLICATE KEY UPDATE games_played = games_played + 1, ...
+
+    Args:
+        db: Session de base de données asynchrone
+        user_id: L'id du joueur
+        score: Le score de la partie
+        words_correct: Nombre de mots corrects
+        words_wrong: Nombre de mots incorrects
+        duration: Durée de la partie (en secondes)
+        played_at: Date de la partie
+    """
+    # première partie du joueur : la ligne est créée avec ces valeurs
+    values = dict(
+        user_id=user_id,
+        games_played=1,
+        total_score=score,
+        best_score=score,
+        total_correct=words_correct,
+        total_wrong=words_wrong,
+        total_duration=duration,
+        last_played_at=played_at
+    )
+    is_mysql = db.get_bind().dialect.name == 'mysql'
+    if is_mysql:
+        statement = mysql_insert(PlayerStats).values(**values)
+        new = statement.inserted
+    else:
+        statement = sqlite_insert(PlayerStats).values(**values)
+        new = statement.excluded
+
+    increments = {
+        'games_played': PlayerStats.games_played + 1,
+        'total_score': PlayerStats.total_score + new.total_score,
+        'best_score': case((PlayerStats.best_score < new.best_score, new.best_score), else_=PlayerStats.best_score),
+        'total_correct': PlayerStats.total_correct + new.total_correct,
+        'total_wrong': PlayerStats.total_wrong + new.total_wrong,
+        'total_duration': PlayerStats.total_duration + new.total_duration,
+        'last_played_at': new.last_played_at
+    }
+    if is_mysql:
+        statement = statement.on_duplicate_key_update(**increments)
+    else:
+        statement = statement.on_conflict_do_update(index_elements=[PlayerStats.user_id], set_=increments)
+    await db.execute(statement)
+
+
+def words_per_minute(words: int, duration: int) -> float:
+    """Mots corrects par minute (0 si la durée est nulle)"""
+    return round(words * 60 / duration, 1) if duration > 0 else 0.0
+
+
+def accuracy(words_correct: int, words_wrong: int) -> float:
+    """Pourcentage de mots corrects parmi les mots tapés (0 si aucun mot)"""
+    total = words_correct + words_wrong
+    return round(words_correct * 100 / total, 1) if total else 0.0
+
+
+async def get_player_stats(db: AsyncSession, user_id: int) -> dict:
+    """
+    Statistiques cumulées d'un joueur (lecture d'une seule ligne, par clé primaire).
+
+    Args:
+        db: Session de base de données asynchrone
+        user_id: L'id du joueur
+
+    Returns:
+        {'games_played', 'best_score', 'average_score', 'accuracy', 'wpm', 'last_played_at'}
+    """
+    stats = await db.get(PlayerStats, user_id)
+    if stats is None:
+        return {
+            'games_played': 0,
+            'best_score': 0,
+            'average_score': 0.0,
+            'accuracy': 0.0,
+            'wpm': 0.0,
+            'last_played_at': None
+        }
+
+    return {
+        'games_played': stats.games_played,
+        'best_score': stats.best_score,
+        'average_score': round(stats.total_score / stats.games_played, 1) if stats.games_played else 0.0,
+        'accuracy': accuracy(stats.total_correct, stats.total_wrong),
+        'wpm': words_per_minute(stats.total_correct, stats.total_duration),
+        'last_played_at': stats.last_played_at
+    }
+
+
+def encode_cursor(created_at: datetime, score_id: int) -> str:
+    """Curseur de pagination de l'historique : "<date ISO>_<id>" de la dernière partie de la page"""
+    return f"{created_at.isoformat()}_{score_id}"
+
+
+def decode_cursor(cursor: str) -> Optional[tuple[datetime, int]]:
+    """
+    Lit un curseur de pagination.
+
+    Returns:
+        (created_at, id) de la dernière partie de la page précédente, ou None si le curseur est invalide
+    """
+    try:
+        created_at, score_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(score_id)
+    except ValueError:
+        return None
+
+
+async def get_history(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = HISTORY_PAGE_SIZE,
+    before: Optional[tuple[datetime, int]] = None
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Une page de l'historique des parties d'un joueur, de la plus récente à la plus ancienne.
+    Equivalent en SQL :
+        SELECT ... FROM scores
+        WHERE user_id = :user_id AND (created_at < :date OR (created_at = :date AND id < :id))
+        ORDER BY created_at DESC, id DESC
+        LIMIT :limit + 1
+
+    Args:
+        db: Session de base de données asynchrone
+        user_id: L'id du joueur
+        limit: Nombre de parties par page
+        before: Position (created_at, id) de la dernière partie de la page précédente
+
+    Returns:
+        (les parties de la page, le curseur de la page suivante ou None s'il n'y en a plus)
+    """
+    query = select(
+        Score.id, Score.score, Score.words_correct, Score.words_wrong, Score.duration, Score.created_at
+    ).where(Score.user_id == user_id)
+
+    if before is not None:
+        created_at, score_id = before
+        query = query.where(or_(
+            Score.created_at < created_at,
+            and_(Score.created_at == created_at, Score.id < score_id)
+        ))
+
+    # on demande une ligne de plus pour savoir s'il y a une page suivante
+    rows = (await db.execute(
+        query.order_by(Score.created_at.desc(), Score.id.desc()).limit(limit + 1)
+    )).all()
+
+    next_cursor = encode_cursor(rows[limit - 1].created_at, rows[limit - 1].id) if len(rows) > limit else None
+    history = [
+        {
+            'score': row.score,
+            'words_correct': row.words_correct,
+            'words_wrong': row.words_wrong,
+            'duration': row.duration,
+            'accuracy': accuracy(row.words_correct, row.words_wrong),
+            'wpm': words_per_minute(row.words_correct, row.duration),
+            'played_at': row.created_at
+        }
+        for row in rows[:limit]
+    ]
+    return history, next_cursor
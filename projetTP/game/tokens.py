@@ -0,0 +1,150 @@
+"""
+Parties anonymes sans BDD pour l'application Dactylogame.
+
+Une partie anonyme n'est pas enregistrée dans game_sessions : tout ce qu'il faut pour
+la rejouer (seed, version de la liste de mots, nombre de mots, début et fin de validité)
+est mis dans un token signé (HMAC-SHA256) renvoyé au client comme session_id.
+Le client ne peut pas modifier le token sans invalider la signature.
+
+Seul le résultat final est enregistré (meilleur score de la ligne "Inconnu").
+Un token ne peut être terminé qu'une fois : les tokens déjà utilisés sont gardés en
+mémoire (UsedTokens) jusqu'à leur expiration.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+# Active les parties anonymes sans BDD (mettre "0" pour les enregistrer dans game_sessions)
+ANONYMOUS_STATELESS = os.getenv("ANONYMOUS_STATELESS", "1") == "1"
+
+# Durée de validité d'un token (en secondes) : le joueur peut attendre avant de lancer le chrono
+ANONYMOUS_TOKEN_LIFETIME = 600
+
+# Préfixe qui distingue un token anonyme d'un session_token classique (uuid)
+ANONYMOUS_TOKEN_PREFIX = "anon."
+
+# Clé de signature : à fixer via GAME_TOKEN_SECRET quand plusieurs processus servent l'application,
+# sinon une clé aléatoire est tirée au démarrage
+_SECRET = os.getenv("GAME_TOKEN_SECRET", "").encode() or secrets.token_bytes(32)
+
+
+@dataclass(frozen=True)
+class AnonymousGame:
+    """Contenu (vérifié) d'un token de partie anonyme"""
+    seed: str
+    words_version: str
+    words_count: int
+    start_time: float  # timestamp
+    expires_at: float  # timestamp
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(_SECRET, payload.encode(), hashlib.sha256).digest()[:16])
+
+
+def is_anonymous_token(session_token: str) -> bool:
+    return session_token.startswith(ANONYMOUS_TOKEN_PREFIX)
+
+
+def create_anonymous_token(seed: str, words_version: str, words_count: int) -> str:
+    """
+    Crée le token signé d'une partie anonyme.
+
+    Args:
+        seed: Graine de la partie
+        words_version: Version de la liste de mots
+        words_count: Nombre de mots de la partie
+
+    Returns:
+        Le token, de la forme "anon.<données>.<signature>"
+    """
+    now = time.time()
+    payload = _b64encode(json.dumps({
+        's': seed,
+        'v': words_version,
+        'n': words_count,
+        't': int(now),
+        'e': int(now + ANONYMOUS_TOKEN_LIFETIME)
+    }, separators=(',', ':')).encode())
+    return f"{ANONYMOUS_TOKEN_PREFIX}{payload}.{_sign(payload)}"
+
+
+def read_anonymous_token(session_token: str) -> Optional[AnonymousGame]:
+    """
+    Vérifie la signature et l'expiration d'un token anonyme.
+
+    Args:
+        session_token: Le token envoyé par le client
+
+    Returns:
+        Le contenu du token, ou None s'il est invalide ou expiré
+    """
+    try:
+        payload, signature = session_token[len(ANONYMOUS_TOKEN_PREFIX):].split('.')
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        data = json.loads(_b64decode(payload))
+        game = AnonymousGame(
+            seed=data['s'],
+            words_version=data['v'],
+            words_count=int(data['n']),
+            start_time=float(data['t']),
+            expires_at=float(data['e'])
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    if game.expires_at <= time.time():
+        return None
+    return game
+
+
+class UsedTokens:
+    """Tokens anonymes déjà terminés (protection contre le rejeu), gardés jusqu'à leur expiration"""
+
+    def __init__(self):
+        self._tokens: dict[str, float] = {}  # token -> expires_at
+        self._lock = threading.Lock()
+
+    def __contains__(self, session_token: str) -> bool:
+        return session_token in self._tokens
+
+    def add(self, session_token: str, expires_at: float) -> bool:
+        """
+        Marque un token comme utilisé.
+
+        Returns:
+            False si le token était déjà utilisé (double envoi de end_game)
+        """
+        with self._lock:
+            if session_token in self._tokens:
+                return False
+            self._purge()
+            self._tokens[session_token] = expires_at
+            return True
+
+    def _purge(self) -> None:
+        # un token expiré est de toute façon refusé par read_anonymous_token.
+        # Les tokens sont ajoutés à peu près dans leur ordre d'expiration : on retire le début du dict
+        now = time.time()
+        while self._tokens:
+            token, expires_at = next(iter(self._tokens.items()))
+            if expires_at > now:
+                break
+            del self._tokens[token]
@@ -0,0 +1,106 @@
+"""
+Module de génération des textes pour l'application Dactylogame.
+
+La liste de mots (static/frequence.json) est chargée une seule fois au démarrage
+de l'application dans un WordSampler, qui garde :
+- les mots (labels) dans un tuple
+- les fréquences cumulées dans un tableau compact (array d'entiers 64 bits)
+
+Le tirage peut être uniforme ou pondéré par la fréquence des mots, et il est
+reproductible à partir d'une seed : une partie est entièrement décrite par
+(seed, version de la liste de mots, nombre de mots), il n'est donc pas nécessaire
+de stocker la suite de mots en BDD.
+"""
+
+import hashlib
+import json
+import random
+from array import array
+from functools import lru_cache
+from itertools import accumulate
+from typing import Optional
+
+# Nombre de suites de mots gardées en mémoire (une par partie en cours environ)
+SEQUENCE_CACHE_SIZE = 4096
+
+
+class WordSampler:
+    """Échantillonneur de mots, construit une seule fois à partir de la liste de fréquences"""
+
+    def __init__(self, labels: list[str], frequencies: list[int], version: str = ""):
+        if not labels:
+            raise ValueError("La liste de mots est vide")
+        if len(labels) != len(frequencies):
+            raise ValueError("Il faut autant de fréquences que de mots")
+
+        self.labels = tuple(labels)
+        # cumulative[i] = somme des fréquences des mots 0..i (ex: [10, 15, 17] pour [10, 5, 2])
+        self.cumulative = array('Q', accumulate(frequencies))
+        self.total = self.cumulative[-1]
+        # identifie la liste de mots : si le fichier change, les anciennes seeds ne donnent plus les mêmes mots
+        self.version = version
+
+        # cache des suites déjà générées (check_word redemande la même suite à chaque mot)
+        self._sequence = lru_cache(maxsize=SEQUENCE_CACHE_SIZE)(self._generate)
+
+    @classmethod
+    def from_json(cls, path: str) -> "WordSampler":
+        """
+        Construit l'échantillonneur depuis un fichier JSON du type
+        [{"type": "dét.", "frequency": 1050561, "label": "le"}, ...]
+
+        Args:
+            path: Chemin vers le fichier JSON
+
+        Returns:
+            Le WordSampler prêt à l'emploi
+        """
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw.decode('utf-8'))
+
+        return cls(
+            [item['label'] for item in data],
+            [int(item['frequency']) for item in data],
+            version=hashlib.sha1(raw).hexdigest()[:12]
+        )
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def sample(self, count: int, seed: Optional[str] = None, weighted: bool = True) -> list[str]:
+        """
+        Tire une suite de mots.
+
+        Args:
+            count: Nombre de mots à tirer
+            seed: Graine du générateur (la même seed donne toujours la même suite de mots)
+            weighted: True pour un tirage pondéré par la fréquence, False pour un tirage uniforme
+
+        Returns:
+            La liste des mots tirés
+        """
+        rng = random.Random(seed)
+
+        if weighted:
+            # random.choices fait une recherche dichotomique (bisect) sur les fréquences cumulées
+            return rng.choices(self.labels, cum_weights=self.cumulative, k=count)
+
+        return rng.choices(self.labels, k=count)
+
+    def sequence(self, seed: str, length: int) -> tuple[str, ...]:
+        """
+        Retourne la suite de mots d'une partie (tirage pondéré).
+        Pour une même liste de mots, (seed, length) donne toujours la même suite.
+
+        Args:
+            seed: Graine de la partie
+            length: Nombre de mots de la partie
+
+        Returns:
+            La suite de mots (tuple non modifiable, partagé via le cache)
+        """
+        return self._sequence(seed, length)
+
+    def _generate(self, seed: str, length: int) -> tuple[str, ...]:
+        return tuple(self.sample(length, seed=seed))
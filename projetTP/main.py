@@ -1,25 +1,115 @@
-from fastapi import FastAPI, HTTPException, Depends, status
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect, status
+from fastapi import Request, Response
+from fastapi.responses import PlainTextResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from email.utils import format_datetime, parsedate_to_datetime
 from fastapi.security import OAuth2PasswordRequestForm
-from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
+from contextlib import asynccontextmanager
+import asyncio
 import uvicorn
 import json
-import random
+import os
+import secrets
 import uuid
-from datetime import datetime, timedelta
-from typing import Optional
-from db.database import get_db, GameSession, Score, User
+from datetime import date, datetime, timedelta
+from typing import Literal, Optional
+from db.database import (
+    get_async_db, AsyncSessionLocal, engine, async_engine, create_tables, IS_SQLITE,
+    GameSession, Score, User
+)
+from db import maintenance
+from db.pool import pool_stats, recent_wait
+from game.words import WordSampler
+from game.cache import ActiveGame, ActiveGameCache, ACTIVE_GAME_WRITE_THROUGH
+from game.tokens import (
+    ANONYMOUS_STATELESS, UsedTokens, is_anonymous_token, create_anonymous_token, read_anonymous_token
+)
+from game.leaderboard import update_best_score, get_player_position, RankingCache
+from game.stats import update_player_stats, get_player_stats, get_history, decode_cursor, HISTORY_PAGE_SIZE
 from auth.auth import (
-    hash_password, 
-    authenticate_user, 
+    hash_password_async,
+    authenticate_user_async,
     create_access_token, 
     get_current_user,
-    get_current_user_optional
+    get_current_user_optional_async,
+    get_current_user_async,
+    token_cache
 )
+from auth.cache import CachedUser
+from web.assets import AssetStore
+from web.responses import FastJSONResponse, encode_with
+from web.ratelimit import ip_limiter, session_limiter, rate_limit, shed_load, START_GAME_COST
+from web import ratelimit
+from monitoring.metrics import metrics, instrument_engine, MetricsMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarrage / arrêt de l'application"""
+    if IS_SQLITE:
+        # en local avec SQLite, la base est créée automatiquement
+        create_tables()
+
+    # en arrière-plan : compteurs des parties expirées du cache, purge des parties abandonnées
+    maintenance_task = asyncio.create_task(maintenance.run_maintenance(jobs=[flush_expired_games]))
+
+    yield
+
+    maintenance_task.cancel()
+    try:
+        await maintenance_task
+    except asyncio.CancelledError:
+        pass
+    try:
+        # les compteurs en mémoire des parties en cours sont écrits avant de fermer les connexions
+        await flush_cached_games(active_games.pop_all())
+    finally:
+        await async_engine.dispose()
+
+
+# Création de l'application FastAPI (réponses JSON encodées avec orjson)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
-app = FastAPI() # Création de l'application FastAPI
+# Compression gzip des réponses de l'API (ex: /api/ranking) ; les fichiers statiques sont déjà compressés
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Ajoute l'en-tête Server-Timing (temps total, temps BDD et nombre de requêtes SQL) aux réponses
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+
+# comptage des requêtes SQL de chaque requête HTTP (voir /metrics)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+# mesure de chaque requête HTTP (ajouté après GZipMiddleware : mesure aussi la compression)
+app.add_middleware(MetricsMiddleware, server_timing=SERVER_TIMING)
+
+
+# Dossier static/ à côté de ce fichier (quel que soit le dossier depuis lequel on lance le serveur)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+# Nombre de mots par partie
+NB_MOTS = 50
+# Durée d'une partie (en secondes) et tolérance accordée pour la fin de partie
+DUREE_PARTIE = 30
+TOLERANCE_FIN = 5
+
+# La liste de mots est chargée une seule fois au démarrage (et non à chaque partie)
+word_sampler = WordSampler.from_json(os.path.join(STATIC_DIR, 'frequence.json'))
+
+# Fichiers statiques chargés et compressés une seule fois au démarrage
+static_assets = AssetStore(STATIC_DIR)
+
+# Parties en cours gardées en mémoire : check_word n'accède pas à la BDD dans le cas courant
+active_games = ActiveGameCache()
+
+# Pages du classement gardées en mémoire, vidées quand un record est battu
+ranking_cache = RankingCache()
+
+# Tokens des parties anonymes déjà terminées (une partie ne peut être terminée qu'une fois)
+used_anonymous_tokens = UsedTokens()
 
 # Modèles Pydantic pour la validation des données
 
@@ -59,22 +149,114 @@ class WordCheck(BaseModel):
     word: str
     index: int
 
+class WordAttempt(BaseModel):
+    index: int = Field(ge=0)
+    word: str
+
+class WordBatchCheck(BaseModel):
+    """Plusieurs mots tapés d'affilée, dans l'ordre (envoyés en une seule requête)"""
+    session_id: str
+    words: list[WordAttempt] = Field(min_length=1, max_length=NB_MOTS)
+
 class GameEnd(BaseModel):
     session_id: str
 
+# Modèles de réponse des routes de jeu
+class GameStarted(BaseModel):
+    """Réponse de /api/start-game"""
+    session_id: str
+    texte: list[str]
+    user_authenticated: bool
+
+class WordChecked(BaseModel):
+    """Réponse de /api/check-word"""
+    correct: bool
+    index: int  # index du mot suivant
+
+class WordResult(BaseModel):
+    index: int
+    correct: bool
+
+class WordsChecked(BaseModel):
+    """Réponse de /api/check-words"""
+    results: list[WordResult]
+    index: int  # index du mot suivant
+
+class GameResult(BaseModel):
+    """Réponse de /api/end-game"""
+    score: int
+    words_correct: int
+    words_wrong: int
+    duration: int  # en secondes
+
+class RankingEntry(BaseModel):
+    rank: Optional[int]  # None si le joueur n'a pas encore de score
+    user_id: Optional[int]  # None pour "Inconnu"
+    username: str
+    best_score: int
+
+class RankingResponse(BaseModel):
+    """Réponse de /api/ranking"""
+    ranking: list[RankingEntry]
+    current_user: Optional[RankingEntry]
+    limit: int
+    offset: int
+    has_more: bool
+    period: str
+    period_start: Optional[date]  # None pour le classement global
+
+class PlayerSummary(BaseModel):
+    games_played: int
+    best_score: int
+    average_score: float
+    accuracy: float  # en %
+    wpm: float  # mots corrects par minute
+    last_played_at: Optional[datetime]
+
+class HistoryEntry(BaseModel):
+    score: int
+    words_correct: int
+    words_wrong: int
+    duration: int
+    accuracy: float
+    wpm: float
+    played_at: datetime
+
+class MyStats(BaseModel):
+    """Réponse de /api/me/stats"""
+    stats: PlayerSummary
+    history: list[HistoryEntry]
+    next_cursor: Optional[str]
+
 @app.get("/")
-def read_root():
-    return FileResponse('static/index.html')
+def read_root(request: Request):
+    return static_assets.response(request, 'index.html')
 
 @app.get("/classement")
-def read_root():
-    return FileResponse('static/classement.html') # Cette route est correcte, mais nous allons l'ajuster pour la cohérence.
+def read_classement(request: Request):
+    return static_assets.response(request, 'classement.html')
+
+@app.get("/static/{filename}")
+def read_static(filename: str, request: Request):
+    """Fichier statique à son adresse stable (revalidé à chaque chargement)"""
+    response = static_assets.response(request, filename)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+    return response
+
+@app.get("/assets/{filename}")
+def read_asset(filename: str, request: Request):
+    """Fichier statique à son adresse versionnée (mis en cache un an par le navigateur)"""
+    response = static_assets.response(request, filename, immutable=True)
+    if response is None:
+        raise HTTPException(status_code=404, detail="Fichier non trouvé")
+    return response
 
 
 # === ROUTES D'AUTHENTIFICATION ==================
 
 @app.post("/api/auth/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """
     Inscription d'un nouvel utilisateur.
     
@@ -87,9 +269,10 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
         
     Raises:
         HTTPException 400: Si le nom d'utilisateur ou l'email existe déjà
+        HTTPException 503: Si le serveur est saturé de calculs de mots de passe
     """
     # Vérifier si le nom d'utilisateur existe déjà
-    existing_user = db.query(User).filter(User.username == user_data.username).first()
+    existing_user = (await db.execute(select(User).where(User.username == user_data.username))).scalar_one_or_none()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,7 +280,7 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Vérifier si l'email existe déjà
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
+    existing_email = (await db.execute(select(User).where(User.email == user_data.email))).scalar_one_or_none()
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -108,14 +291,14 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
     new_user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=hash_password(user_data.password),
+        password_hash=await hash_password_async(user_data.password),
         created_at=datetime.now(),
         updated_at=datetime.now()
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Créer le token d'accès
     access_token = create_access_token(data={"sub": str(new_user.id)})
@@ -124,7 +307,7 @@ def register(user_data: UserRegister, db: Session = Depends(get_db)):
 
 
 @app.post("/api/auth/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
     """
     Connexion d'un utilisateur existant.
     
@@ -137,8 +320,9 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
         
     Raises:
         HTTPException 401: Si les identifiants sont incorrects
+        HTTPException 503: Si le serveur est saturé de calculs de mots de passe
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -154,7 +338,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 
 @app.get("/api/auth/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_user)):
+def get_me(current_user: CachedUser = Depends(get_current_user)):
     """
     Récupère les informations de l'utilisateur actuellement connecté.
     
@@ -172,72 +356,500 @@ def get_me(current_user: User = Depends(get_current_user)):
 
 # ================== ROUTES DE JEU ==================
 
-@app.post("/api/start-game")
-def start_game(
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional)
-):
+def get_session_words(session: GameSession) -> tuple[str, ...]:
     """
-    Démarre une nouvelle partie et retourne le texte à taper.
-    Cette route fonctionne avec ou sans authentification.
-    
+    Retrouve la suite de mots d'une partie à partir de sa seed.
+
+    Args:
+        session: La session de jeu
+
+    Returns:
+        La suite de mots de la partie
+
+    Raises:
+        HTTPException 410: Si la liste de mots a changé depuis le début de la partie
+    """
+    if session.words_version == word_sampler.version:
+        return word_sampler.sequence(session.seed, session.words_count)
+
+    # anciennes parties dont la suite de mots était stockée en JSON
+    if session.words_sequence:
+        return tuple(json.loads(session.words_sequence))
+
+    raise HTTPException(status_code=410, detail="La liste de mots a changé depuis le début de la partie")
+
+
+async def flush_game_counters(db: AsyncSession, games: list[ActiveGame]) -> None:
+    """
+    Écrit en BDD les compteurs en attente des parties du cache (sans commit).
+    L'incrément est fait côté SQL (x = x + n) pour ne pas écraser les autres écritures.
+
+    Args:
+        db: Session de base de données
+        games: Les parties dont les compteurs doivent être écrits
+    """
+    for game in games:
+        if not game.pending_correct and not game.pending_wrong:
+            continue
+        if is_anonymous_token(game.session_token):
+            continue  # partie anonyme : rien en BDD
+        await db.execute(
+            update(GameSession)
+            .where(GameSession.session_token == game.session_token, GameSession.is_completed == False)
+            .values(
+                words_correct_count=GameSession.words_correct_count + game.pending_correct,
+                words_wrong_count=GameSession.words_wrong_count + game.pending_wrong
+            )
+        )
+
+
+async def flush_cached_games(games: list[ActiveGame]) -> None:
+    """
+    Écrit en BDD (et commit) les compteurs des parties retirées du cache.
+    En cas d'erreur, les parties sont remises dans le cache pour ne pas perdre leurs compteurs.
+
+    Args:
+        games: Les parties retirées du cache (expirées, ou toutes à l'arrêt)
+    """
+    if not games:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await flush_game_counters(db, games)
+            await db.commit()
+    except Exception:
+        for game in games:
+            active_games.put(game)
+        raise
+
+
+async def flush_expired_games() -> None:
+    """Écrit en BDD les compteurs des parties expirées du cache (tâche de la boucle de maintenance)"""
+    await flush_cached_games(active_games.pop_expired())
+
+
+async def write_through(db: AsyncSession, game: ActiveGame) -> None:
+    """
+    Écrit tout de suite en BDD les compteurs d'une partie (si ACTIVE_GAME_WRITE_THROUGH est activé) :
+    avec plusieurs processus, le prochain mot peut être vérifié par un autre processus.
+
+    Args:
+        db: Session de base de données
+        game: La partie dont les compteurs viennent de changer
+
+    Raises:
+        HTTPException 400: Si la session a été terminée entre-temps (par un autre processus)
+    """
+    if not ACTIVE_GAME_WRITE_THROUGH or is_anonymous_token(game.session_token):
+        return
+
+    nb_correct, nb_wrong = active_games.take_pending(game)
+    result = await db.execute(
+        update(GameSession)
+        .where(GameSession.session_token == game.session_token, GameSession.is_completed == False)
+        .values(
+            words_correct_count=GameSession.words_correct_count + nb_correct,
+            words_wrong_count=GameSession.words_wrong_count + nb_wrong
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+    if result.rowcount == 0:
+        active_games.pop(game.session_token)
+        raise HTTPException(status_code=400, detail="Session déjà terminée")
+
+
+async def get_active_game(db: AsyncSession, session_token: str) -> ActiveGame:
+    """
+    Retourne la partie en cours depuis le cache, ou la recharge depuis la BDD si besoin
+    (partie expirée du cache ou démarrée par un autre processus).
+
+    Args:
+        db: Session de base de données (utilisée seulement si la partie n'est pas dans le cache)
+        session_token: Le token de la session de jeu
+
+    Returns:
+        La partie en cours
+
+    Raises:
+        HTTPException 404: Si la session n'existe pas
+        HTTPException 400: Si la session est déjà terminée
+    """
+    game = active_games.get(session_token)
+    if game is not None:
+        return game
+
+    if is_anonymous_token(session_token):
+        return load_anonymous_game(session_token)
+
+    # la partie a peut-être expiré du cache : on écrit d'abord ses compteurs en attente
+    stale = active_games.pop(session_token)
+    if stale is not None:
+        await flush_game_counters(db, [stale])
+        await db.commit()
+
+    session = (await db.execute(
+        select(GameSession).where(GameSession.session_token == session_token)
+    )).scalar_one_or_none()
+
+    if not session:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+
+    if session.is_completed:
+        raise HTTPException(status_code=400, detail="Session déjà terminée")
+
+    game = ActiveGame(
+        session_token=session.session_token,
+        user_id=session.user_id,
+        words=get_session_words(session),
+        words_correct_count=session.words_correct_count,
+        words_wrong_count=session.words_wrong_count
+    )
+    active_games.put(game)
+    return game
+
+
+def load_anonymous_game(session_token: str) -> ActiveGame:
+    """
+    Recrée une partie anonyme absente du cache à partir de son token signé (aucun accès BDD).
+
+    Args:
+        session_token: Le token signé de la partie
+
+    Returns:
+        La partie en cours
+
+    Raises:
+        HTTPException 404: Si le token est invalide ou expiré
+        HTTPException 400: Si la partie est déjà terminée
+        HTTPException 410: Si la liste de mots a changé depuis le début de la partie
+    """
+    token = read_anonymous_token(session_token)
+    if token is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+
+    if session_token in used_anonymous_tokens:
+        raise HTTPException(status_code=400, detail="Session déjà terminée")
+
+    if token.words_version != word_sampler.version:
+        raise HTTPException(status_code=410, detail="La liste de mots a changé depuis le début de la partie")
+
+    # si la partie a expiré du cache, on garde ses compteurs
+    game = active_games.pop(session_token) or ActiveGame(
+        session_token=session_token,
+        user_id=None,
+        words=word_sampler.sequence(token.seed, token.words_count)
+    )
+    active_games.put(game)
+    return game
+
+
+async def create_game(db: AsyncSession, current_user: Optional[CachedUser]) -> dict:
+    """
+    Crée une nouvelle partie (en BDD et dans le cache) et retourne le texte à taper.
+    Utilisée par la route HTTP /api/start-game et par le WebSocket /ws/game.
+
     Args:
         db: Session de base de données
         current_user: L'utilisateur connecté (optionnel)
-        
+
     Returns:
         Un objet contenant l'ID de session et le texte à taper
     """
-    # Charger le fichier JSON des mots
-    try:
-        with open('static/frequence.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-    except FileNotFoundError:
-        raise HTTPException(status_code=500, detail="Fichier de mots introuvable")
-    
-    # Générer un texte aléatoire
-    nb_mots = 50
-    texte_arr = []
-    for _ in range(nb_mots):
-        mot = random.choice(data)['label']
-        texte_arr.append(mot)
-    
     # Créer une session unique
     session_token = str(uuid.uuid4()) ## ressemblera à un truc du genre https://www.uuidgenerator.net/version4 ("f47ac10b-58cc-4372-a567-0e02b2c3d479")
     # On ne pourra "jamais" obtenir deux uuid identiques (122 bits aléatoires réels donc environ 5,32*10^36 possibilités (c'est beaucoup))
-    seed = str(random.randint(100000, 999999))
-    # la seed permettra de régénérer la même suite de mot au besoin
+    seed = str(secrets.randbits(64))
+    # la seed permet de régénérer la même suite de mot : elle n'est donc plus stockée en BDD
+
+    # Générer un texte aléatoire (tirage pondéré par la fréquence des mots)
+    texte_arr = word_sampler.sequence(seed, NB_MOTS)
+
+    if current_user is None and ANONYMOUS_STATELESS:
+        # Partie anonyme : rien en BDD, la partie est entièrement décrite par un token signé
+        session_token = create_anonymous_token(seed, word_sampler.version, NB_MOTS)
+        active_games.put(ActiveGame(session_token=session_token, user_id=None, words=texte_arr))
+        return {
+            'session_id': session_token,
+            'texte': list(texte_arr),
+            'user_authenticated': False
+        }
     
     # Créer la session en BDD (avec ou sans user_id)
     new_session = GameSession(
         user_id=current_user.id if current_user else None,
         session_token=session_token,
-        words_sequence=json.dumps(texte_arr),
         seed=seed,
+        words_version=word_sampler.version,
+        words_count=NB_MOTS,
         start_time=datetime.now(),
-        expected_end_time=datetime.now() + timedelta(seconds=30),
+        expected_end_time=datetime.now() + timedelta(seconds=DUREE_PARTIE),
         is_completed=False
     )
     
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    await db.commit()
+
+    active_games.put(ActiveGame(
+        session_token=session_token,
+        user_id=new_session.user_id,
+        words=texte_arr
+    ))
     
     return {
         'session_id': session_token,
-        'texte': texte_arr,
+        'texte': list(texte_arr),
         'user_authenticated': current_user is not None
     }
 
-@app.post("/api/check-word")
-def check_word(data: WordCheck, db: Session = Depends(get_db)):
+
+def verify_words(game: ActiveGame, attempts: list[WordAttempt]) -> list[dict]:
+    """
+    Vérifie une suite ordonnée de mots tapés et met à jour les compteurs une seule fois.
+    Tout le lot est validé avant de compter quoi que ce soit.
+
+    Args:
+        game: La partie en cours
+        attempts: Les mots tapés (index, word), dans l'ordre
+
+    Returns:
+        Le résultat de chaque mot : [{'index': 0, 'correct': True}, ...]
+
+    Raises:
+        HTTPException 400: Si un index est hors limites ou si les index ne sont pas croissants
+    """
+    texte_arr = game.words
+
+    # on valide tout le lot avant de compter quoi que ce soit
+    last_index = -1
+    for attempt in attempts:
+        if attempt.index >= len(texte_arr):
+            raise HTTPException(status_code=400, detail="Index hors limites")
+        if attempt.index <= last_index:
+            raise HTTPException(status_code=400, detail="Les index doivent être croissants")
+        last_index = attempt.index
+    
+    results = []
+    nb_correct = 0
+    for attempt in attempts:
+        is_correct = attempt.word == texte_arr[attempt.index]
+        nb_correct += is_correct
+        results.append({'index': attempt.index, 'correct': is_correct})
+    
+    active_games.record_many(game, nb_correct, len(results) - nb_correct)
+    return results
+
+
+async def finish_game(db: AsyncSession, session_token: str) -> dict:
+    """
+    Termine une partie : écrit ses compteurs et sauvegarde le score en BDD, en une seule transaction.
+    Utilisée par la route HTTP /api/end-game et par le WebSocket /ws/game.
+
+    Args:
+        db: Session de base de données
+        session_token: Le token de la session de jeu
+
+    Returns:
+        Un objet contenant les statistiques de la partie
+
+    Raises:
+        HTTPException 404: Si la session n'existe pas
+        HTTPException 400: Si la session est déjà terminée
+    """
+    if is_anonymous_token(session_token):
+        return await finish_anonymous_game(db, session_token)
+
+    # la partie quitte le cache : ses compteurs en mémoire sont écrits avec le score
+    game = active_games.pop(session_token)
+    pending_correct = game.pending_correct if game is not None else 0
+    pending_wrong = game.pending_wrong if game is not None else 0
+
+    # Terminer la session et écrire les compteurs en une seule requête conditionnelle :
+    # UPDATE game_sessions SET is_completed = 1, words_correct_count = words_correct_count + ?, ...
+    # WHERE session_token = ? AND is_completed = 0
+    # Si deux fins de partie arrivent en même temps, une seule modifie la ligne (pas de score en double)
+    result = await db.execute(
+        update(GameSession)
+        .where(GameSession.session_token == session_token, GameSession.is_completed == False)
+        .values(
+            is_completed=True,
+            words_correct_count=GameSession.words_correct_count + pending_correct,
+            words_wrong_count=GameSession.words_wrong_count + pending_wrong
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+    if result.rowcount == 0:
+        await db.rollback()
+        exists = await db.scalar(select(GameSession.id).where(GameSession.session_token == session_token))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Session non trouvée")
+        raise HTTPException(status_code=400, detail="Session déjà terminée")
+
+    try:
+        # la ligne est verrouillée par l'UPDATE jusqu'au commit
+        session = (await db.execute(
+            select(
+                GameSession.id, GameSession.user_id, GameSession.start_time,
+                GameSession.words_correct_count, GameSession.words_wrong_count
+            ).where(GameSession.session_token == session_token)
+        )).one()
+
+        # Calculer la durée réelle
+        duration = int((datetime.now() - session.start_time).total_seconds())
+        if duration > DUREE_PARTIE + TOLERANCE_FIN:  # Tolérance de 5 secondes
+            duration = DUREE_PARTIE
+
+        # Calculer le score côté serveur
+        final_score = session.words_correct_count
+
+        # Créer le score en BDD
+        # user_id sera NULL pour les sessions anonymes, ou l'ID de l'utilisateur connecté
+        new_score = Score(
+            user_id=session.user_id,  # Peut être NULL pour les joueurs anonymes
+            score=final_score,
+            words_correct=session.words_correct_count,
+            words_wrong=session.words_wrong_count,
+            duration=duration,
+            created_at=datetime.now()
+        )
+        db.add(new_score)
+        await db.flush()  # INSERT du score, pour avoir son id
+
+        await db.execute(
+            update(GameSession)
+            .where(GameSession.id == session.id)
+            .values(score_id=new_score.id)
+            .execution_options(synchronize_session=False)
+        )
+        # Mettre à jour les meilleurs scores du joueur (global, du jour, de la semaine) dans la même transaction
+        records = await update_best_score(db, session.user_id, final_score, new_score.created_at)
+        # et ses statistiques cumulées (joueurs connectés uniquement)
+        if session.user_id is not None:
+            await update_player_stats(
+                db, session.user_id, final_score, session.words_correct_count,
+                session.words_wrong_count, duration, new_score.created_at
+            )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        # la session n'a pas été terminée : on remet la partie dans le cache pour ne pas perdre ses compteurs
+        if game is not None:
+            active_games.put(game)
+        raise
+
+    if records:
+        # les classements de ces périodes ont pu changer
+        ranking_cache.invalidate(records)
+
+    return {
+        'score': final_score,
+        'words_correct': session.words_correct_count,
+        'words_wrong': session.words_wrong_count,
+        'duration': duration
+    }
+
+
+async def finish_anonymous_game(db: AsyncSession, session_token: str) -> dict:
+    """
+    Termine une partie anonyme : seul le meilleur score de la ligne "Inconnu" est mis à jour en BDD
+    (pas de GameSession ni de Score enregistré).
+
+    Args:
+        db: Session de base de données
+        session_token: Le token signé de la partie
+
+    Returns:
+        Un objet contenant les statistiques de la partie
+
+    Raises:
+        HTTPException 404: Si le token est invalide ou expiré
+        HTTPException 400: Si la partie est déjà terminée
+    """
+    token = read_anonymous_token(session_token)
+    if token is None:
+        raise HTTPException(status_code=404, detail="Session non trouvée")
+
+    if session_token in used_anonymous_tokens:
+        raise HTTPException(status_code=400, detail="Session déjà terminée")
+
+    # la partie n'est plus en mémoire (expirée du cache, redémarrage) : on la termine depuis le token,
+    # mais ses compteurs n'étaient gardés qu'en mémoire (score de 0)
+    game = active_games.pop(session_token) or ActiveGame(session_token=session_token, user_id=None, words=())
+
+    # protection contre le rejeu : un token ne peut être terminé qu'une fois
+    if not used_anonymous_tokens.add(session_token, token.expires_at):
+        raise HTTPException(status_code=400, detail="Session déjà terminée")
+
+    # Calculer la durée réelle
+    duration = int((datetime.now() - datetime.fromtimestamp(token.start_time)).total_seconds())
+    if duration > DUREE_PARTIE + TOLERANCE_FIN:  # Tolérance de 5 secondes
+        duration = DUREE_PARTIE
+
+    # Calculer le score côté serveur
+    final_score = game.total_correct
+
+    records = await update_best_score(db, None, final_score, datetime.now())
+    if records:
+        await db.commit()
+        # les classements de ces périodes ont pu changer
+        ranking_cache.invalidate(records)
+
+    return {
+        'score': final_score,
+        'words_correct': game.total_correct,
+        'words_wrong': game.total_wrong,
+        'duration': duration
+    }
+
+
+def limit_game(cost: float = 1.0, shed: bool = True):
+    """
+    Dépendance des routes de jeu : budget par adresse IP, et délestage si la BDD est saturée.
+
+    Args:
+        cost: Nombre de jetons consommés par la requête
+        shed: False pour ne jamais délester la route (fin de partie)
+    """
+    async def dependency(request: Request) -> None:
+        if shed:
+            shed_load(recent_wait(async_engine.pool))
+        rate_limit(ip_limiter, request.client.host if request.client else 'inconnu', cost)
+    return dependency
+
+@app.post("/api/start-game", response_model=GameStarted, dependencies=[Depends(limit_game(START_GAME_COST))])
+async def start_game(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[CachedUser] = Depends(get_current_user_optional_async)
+):
+    """
+    Démarre une nouvelle partie et retourne le texte à taper.
+    Cette route fonctionne avec ou sans authentification.
+    
+    Args:
+        db: Session de base de données
+        current_user: L'utilisateur connecté (optionnel)
+        
+    Returns:
+        Un objet contenant l'ID de session et le texte à taper
+        
+    Raises:
+        HTTPException 429: Si le client a dépassé son budget de requêtes
+        HTTPException 503: Si la BDD est saturée (délestage)
+    """
+    return await create_game(db, current_user)
+
+@app.post("/api/check-word", response_model=WordChecked, dependencies=[Depends(limit_game())])
+async def check_word(data: WordCheck, db: AsyncSession = Depends(get_async_db)):
     """
     Vérifie si le mot est tapé est correct.
     Cette route fonctionne avec ou sans authentification.
+    Les compteurs sont gardés en mémoire et écrits en BDD à la fin de la partie.
     
     Args:
         data: Les données de vérification (session_id, word, index)
-        db: Session de base de données
+        db: Session de base de données (utilisée seulement si la partie n'est pas en cache)
         
     Returns:
         Un objet indiquant si le mot est correct et l'index suivant
@@ -245,16 +857,11 @@ def check_word(data: WordCheck, db: Session = Depends(get_db)):
     Raises:
         HTTPException 404: Si la session n'existe pas
         HTTPException 400: Si la session est déjà terminée ou l'index est invalide
+        HTTPException 429: Si le client ou la partie a dépassé son budget de requêtes
     """
-    session = db.query(GameSession).filter(GameSession.session_token == data.session_id).first()
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session non trouvée")
-    
-    if session.is_completed:
-        raise HTTPException(status_code=400, detail="Session déjà terminée")
-    
-    texte_arr = json.loads(session.words_sequence)
+    rate_limit(session_limiter, data.session_id)
+    game = await get_active_game(db, data.session_id)
+    texte_arr = game.words
     
     if data.index >= len(texte_arr):
         raise HTTPException(status_code=400, detail="Index hors limites")
@@ -262,21 +869,46 @@ def check_word(data: WordCheck, db: Session = Depends(get_db)):
     mot_attendu = texte_arr[data.index]
     is_correct = data.word == mot_attendu
     
-    # Incrémenter les compteurs côté serveur
-    if is_correct:
-        session.words_correct_count += 1
-    else:
-        session.words_wrong_count += 1
-    
-    db.commit()
+    # Incrémenter les compteurs côté serveur (en mémoire)
+    active_games.record(game, is_correct)
+    await write_through(db, game)
     
     return {
         'correct': is_correct,
         'index': data.index + 1
     }
 
-@app.post("/api/end-game")
-def end_game(data: GameEnd, db: Session = Depends(get_db)):
+@app.post("/api/check-words", response_model=WordsChecked, dependencies=[Depends(limit_game())])
+async def check_words(data: WordBatchCheck, db: AsyncSession = Depends(get_async_db)):
+    """
+    Vérifie un lot de mots tapés d'affilée (le client regroupe ses envois toutes les ~300 ms).
+    Les compteurs ne sont mis à jour qu'une fois pour tout le lot.
+    Cette route fonctionne avec ou sans authentification.
+    
+    Args:
+        data: Les données de vérification (session_id, liste ordonnée de (index, word))
+        db: Session de base de données (utilisée seulement si la partie n'est pas en cache)
+        
+    Returns:
+        Un objet contenant le résultat de chaque mot et l'index suivant
+        
+    Raises:
+        HTTPException 404: Si la session n'existe pas
+        HTTPException 400: Si la session est déjà terminée ou si les index sont invalides
+        HTTPException 429: Si le client ou la partie a dépassé son budget de requêtes
+    """
+    rate_limit(session_limiter, data.session_id)
+    game = await get_active_game(db, data.session_id)
+    results = verify_words(game, data.words)
+    await write_through(db, game)
+    
+    return {
+        'results': results,
+        'index': data.words[-1].index + 1
+    }
+
+@app.post("/api/end-game", response_model=GameResult, dependencies=[Depends(limit_game(shed=False))])
+async def end_game(data: GameEnd, db: AsyncSession = Depends(get_async_db)):
     """
     Termine la partie et sauvegarde le score en BDD.
     Cette route fonctionne avec ou sans authentification.
@@ -291,151 +923,303 @@ def end_game(data: GameEnd, db: Session = Depends(get_db)):
     Raises:
         HTTPException 404: Si la session n'existe pas
         HTTPException 400: Si la session est déjà terminée
+        HTTPException 429: Si le client a dépassé son budget de requêtes
     """
-    session = db.query(GameSession).filter(GameSession.session_token == data.session_id).first()
-    
-    if not session:
-        raise HTTPException(status_code=404, detail="Session non trouvée")
-    
-    if session.is_completed:
-        raise HTTPException(status_code=400, detail="Session déjà terminée")
-    
-    # Calculer la durée réelle
-    duration = int((datetime.now() - session.start_time).total_seconds())
-    if duration > 35:  # Tolérance de 5 secondes
-        duration = 30
-    
-    # Calculer le score côté serveur
-    final_score = session.words_correct_count
-    
-    # Créer le score en BDD
-    # user_id sera NULL pour les sessions anonymes, ou l'ID de l'utilisateur connecté
-    new_score = Score(
-        user_id=session.user_id,  # Peut être NULL pour les joueurs anonymes
-        score=final_score,
-        words_correct=session.words_correct_count,
-        words_wrong=session.words_wrong_count,
-        duration=duration,
-        created_at=datetime.now()
-    )
-    
-    db.add(new_score)
-    db.commit()
-    db.refresh(new_score)
-    
-    # Mettre à jour la session
-    session.is_completed = True
-    session.score_id = new_score.id
-    db.commit()
-    
-    return {
-        'score': final_score,
-        'words_correct': session.words_correct_count,
-        'words_wrong': session.words_wrong_count,
-        'duration': duration
-    }
+    return await finish_game(db, data.session_id)
+
 
+# ================== WEBSOCKET DE JEU ==================
+# Une partie complète passe par une seule connexion persistante (un message par mot)
+# au lieu d'une requête HTTP par mot. Messages échangés (JSON) :
+#   client -> {"type": "start", "token": "<jwt ou null>"}
+#   serveur <- {"type": "started", "session_id": ..., "texte": [...], "user_authenticated": ...}
+#   client -> {"type": "check", "index": 0, "word": "le"}
+#   serveur <- {"type": "result", "index": 0, "correct": true}
+#   client -> {"type": "end"}   (ou fin automatique quand le chrono est écoulé)
+#   serveur <- {"type": "ended", "score": ..., "words_correct": ..., "words_wrong": ..., "duration": ...}
+#   serveur <- {"type": "error", "detail": "..."} en cas de message invalide
 
-@app.get('/api/ranking')
-def ranking(db: Session = Depends(get_db), current_user: Optional[User] = Depends(get_current_user_optional)):
+async def ws_create_game(token: Optional[str]) -> dict:
+    """Démarre une partie pour le WebSocket (les dépendances FastAPI ne sont pas utilisées ici)"""
+    async with AsyncSessionLocal() as db:
+        current_user = await get_current_user_optional_async(token, db) if token else None
+        return await create_game(db, current_user)
+
+
+async def ws_finish_game(session_token: str) -> dict:
+    """Termine une partie pour le WebSocket"""
+    async with AsyncSessionLocal() as db:
+        return await finish_game(db, session_token)
+
+
+@app.websocket("/ws/game")
+async def game_websocket(websocket: WebSocket):
     """
-    Retourne le classement global basé sur le meilleur score par joueur.
-    Les sessions anonymes (user_id is NULL) sont regroupées sous le pseudo 'Inconnu'.
-    Si l'utilisateur est connecté, on retourne également sa position dans le classement.
+    Déroule une partie complète sur une seule connexion WebSocket.
+    Le chrono côté serveur démarre au premier mot reçu : la partie est terminée
+    automatiquement DUREE_PARTIE + TOLERANCE_FIN secondes plus tard si le client n'a pas envoyé "end".
+    La partie est relue dans le cache à chaque mot (ce qui prolonge sa durée de vie) : elle
+    n'expire donc pas pendant qu'on joue.
     """
-    from sqlalchemy import func
+    await websocket.accept()
+    loop = asyncio.get_running_loop()
+    session_token = None
+    game = None
+    deadline = None
 
-    # On récupère pour chauqe users, sont score le plus haut
-    # Equivalent en SQL :
-    # SELECT user_id, max(score) as "best_score"
-    # FROM scores
-    # GROUP BY user_id
-    bests = db.query(Score.user_id, func.max(Score.score).label('best_score'))\
-              .group_by(Score.user_id).all()
-    # bests ressemble à:
-    # [(None, 24), (5, 8), (7, 21), (8, 21), (10, 23)]
+    try:
+        while True:
+            # en attente du premier mot, on laisse au joueur la durée de vie de la partie en cache,
+            # moins la durée de la partie (qui doit encore tenir dans le cache une fois commencée)
+            if deadline is None:
+                timeout = max(active_games.ttl - (DUREE_PARTIE + TOLERANCE_FIN), 1)
+            else:
+                timeout = max(deadline - loop.time(), 0)
+            try:
+                text = await asyncio.wait_for(websocket.receive_text(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if game is not None:
+                    try:
+                        result = await ws_finish_game(session_token)
+                        await websocket.send_json({'type': 'ended', **result})
+                    except HTTPException as e:
+                        await websocket.send_json({'type': 'error', 'detail': e.detail})
+                break
 
-    best_map = {row.user_id: row.best_score for row in bests}
-    # best_map ressemble à {None: 24, 5: 8, 7: 21, 8: 21, 10: 23}
+            try:
+                message = json.loads(text)
+            except json.JSONDecodeError:
+                message = None
+            if not isinstance(message, dict):
+                await websocket.send_json({'type': 'error', 'detail': "Message invalide"})
+                continue
 
-    results = []
+            try:
+                kind = message.get('type')
 
-    # Retrouver les usernames selon les ids des joueurs
-    if best_map:
-        user_ids = [uid for uid in best_map.keys() if uid is not None]
-        if user_ids:
-            users = db.query(User).filter(User.id.in_(user_ids)).all()
-            for u in users:
-                results.append({
-                    'user_id': u.id,
-                    'username': u.username,
-                    'best_score': int(best_map.get(u.id, 0))
-                })
-
-    # les joueurs sans id sont marqués avec un username "Inconnu"
-    anon_best = best_map.get(None)
-    if anon_best is not None:
-        results.append({
-            'user_id': None,
-            'username': 'Inconnu',
-            'best_score': int(anon_best)
-        })
-
-    """
-    results ressemble à :
-    [
-        {'user_id': 5, 'username': 'testtest', 'best_score': 8},
-        {'user_id': 7, 'username': 'hjddhsdij', 'best_score': 21},
-        {'user_id': 8, 'username': 'Arlette', 'best_score': 21}, 
-        ...
-    ]
+                if kind == 'start' and game is None:
+                    shed_load(recent_wait(async_engine.pool))
+                    rate_limit(ip_limiter, websocket.client.host if websocket.client else 'inconnu', START_GAME_COST)
+                    started = await ws_create_game(message.get('token'))
+                    session_token = started['session_id']
+                    game = active_games.get(session_token)
+                    await websocket.send_json({'type': 'started', **started})
+
+                elif kind == 'check' and game is not None:
+                    rate_limit(session_limiter, session_token)
+                    # relecture dans le cache : prolonge la durée de vie de la partie
+                    game = active_games.get(session_token)
+                    if game is None:
+                        await websocket.send_json({'type': 'error', 'detail': "Session non trouvée"})
+                        break
+                    attempt = WordAttempt(index=message.get('index'), word=message.get('word'))
+                    if deadline is None:
+                        deadline = loop.time() + DUREE_PARTIE + TOLERANCE_FIN
+                    result = verify_words(game, [attempt])[0]
+                    await websocket.send_json({'type': 'result', **result})
+
+                elif kind == 'end' and game is not None:
+                    result = await ws_finish_game(session_token)
+                    await websocket.send_json({'type': 'ended', **result})
+                    break
+
+                else:
+                    await websocket.send_json({'type': 'error', 'detail': "Message inattendu"})
+
+            except HTTPException as e:
+                await websocket.send_json({'type': 'error', 'detail': e.detail})
+            except ValidationError:
+                await websocket.send_json({'type': 'error', 'detail': "Message invalide"})
+
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        # le joueur a fermé la page : la partie reste dans le cache, ses compteurs
+        # seront écrits en BDD à son expiration
+        pass
+
+
+@app.get('/api/me/stats', response_model=MyStats)
+async def my_stats(
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=100),
+    before: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CachedUser = Depends(get_current_user_async)
+):
     """
+    Statistiques du joueur connecté (parties jouées, meilleur score, score moyen, précision,
+    mots par minute) et une page de son historique, de la partie la plus récente à la plus ancienne.
+    
+    Args:
+        limit: Nombre de parties par page d'historique
+        before: Curseur renvoyé par la page précédente (next_cursor), pour les pages suivantes
+        db: Session de base de données
+        current_user: L'utilisateur connecté
+        
+    Returns:
+        Les statistiques, la page d'historique et le curseur de la page suivante (None si c'est la dernière)
+        
+    Raises:
+        HTTPException 401: Si l'utilisateur n'est pas authentifié
+        HTTPException 400: Si le curseur est invalide
+    """
+    position = None
+    if before is not None:
+        position = decode_cursor(before)
+        if position is None:
+            raise HTTPException(status_code=400, detail="Curseur invalide")
+
+    history, next_cursor = await get_history(db, current_user.id, limit, position)
+    return {
+        'stats': await get_player_stats(db, current_user.id),
+        'history': history,
+        'next_cursor': next_cursor
+    }
 
-    # Tri du plus grand au plus petit selon le score
-    results.sort(key=lambda x: x['best_score'], reverse=True)
-
-    # Construction du ranking : les gens avec le même score sont placés dans la même place
-    ranked = []
-    rank = 0
-    last_score = None
-    for item in results:
-        if last_score is None or item['best_score'] != last_score:
-            rank += 1
-            last_score = item['best_score']
-        ranked.append({
-            'rank': rank,
-            **item
-        })
+@app.get('/api/ranking', response_model=RankingResponse)
+async def ranking(
+    request: Request,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    period: Literal['all', 'day', 'week'] = Query('all'),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[CachedUser] = Depends(get_current_user_optional_async)
+):
+    """
+    Retourne une page du classement basé sur le meilleur score par joueur : depuis toujours,
+    du jour ou de la semaine en cours (la semaine commence le lundi).
+    Les sessions anonymes (user_id is NULL) sont regroupées sous le pseudo 'Inconnu'.
+    Si l'utilisateur est connecté, on retourne également sa position dans le classement.
+    La page est servie depuis la mémoire (ranking_cache), et le navigateur reçoit un
+    304 Not Modified si elle n'a pas changé depuis son dernier appel (ETag / Last-Modified).
+    La liste des joueurs est insérée telle quelle dans la réponse, déjà encodée en JSON
+    (une fois par page mise en cache) : seuls les autres champs sont encodés à chaque appel.
+    
+    Args:
+        request: La requête HTTP (en-têtes If-None-Match / If-Modified-Since)
+        limit: Nombre de joueurs par page
+        offset: Nombre de joueurs à sauter (pages suivantes)
+        period: "all" (depuis toujours), "day" (aujourd'hui) ou "week" (cette semaine)
+        db: Session de base de données
+        current_user: L'utilisateur connecté (optionnel)
         
+    Returns:
+        La page du classement, la position du joueur connecté et s'il reste des pages
     """
-    ranked ressemble à :
+    # Page du classement, depuis le cache si possible
+    # Equivalent en SQL (quand la page n'est pas en cache) :
+    # SELECT b.user_id, u.username, b.best_score
+    # FROM best_scores b LEFT JOIN users u ON u.id = b.user_id
+    # ORDER BY b.best_score DESC, b.achieved_at
+    # LIMIT :limit OFFSET :offset
+    # (pour un jour / une semaine : la même requête sur period_best_scores
+    #  WHERE period = :period AND period_start = :debut_de_la_periode)
+    page = await ranking_cache.get_page(db, limit, offset, period)
+    """
+    page.rows ressemble à :
     [
-        {'rank': 1, 'user_id': None, 'username': 'Inconnu', 'best_score': 24}, 
-        {'rank': 2, 'user_id': 10, 'username': 'jdk', 'best_score': 23}, 
-        {'rank': 3, 'user_id': 7, 'username': 'hjddhsdij', 'best_score': 21}
+        RankingRow(rank=1, user_id=None, username='Inconnu', best_score=24),
+        RankingRow(rank=2, user_id=10, username='jdk', best_score=23),
+        RankingRow(rank=3, user_id=7, username='hjddhsdij', best_score=21)
     ]
+    et page.json à b'[{"rank":1,"user_id":null,"username":"Inconnu","best_score":24},...]'
     """
 
-    # Trouver la position du joueur qui est allé voir le classement
-    current_info = None
-    if current_user:
-        # essayer de trouver le score du joueur connect
-        your_best = best_map.get(current_user.id)
-        if your_best is None: # si le joueur n'a pas encore de score
-            current_info = {'user_id': current_user.id, 'username': current_user.username or 'Inconnu', 'best_score': 0, 'rank': None}
-        else:
-            for r in ranked:
-                if r['user_id'] == current_user.id:
-                    current_info = r
-                    break
-    return {
-        'ranking': ranked,
-        'current_user': current_info
+    # Position du joueur qui est allé voir le classement (ajoutée à la page en cache)
+    current_info = await get_player_position(db, current_user, ranking_cache, period) if current_user else None
+
+    # l'ETag dépend de la page et de la position du joueur connecté
+    etag = f'W/"{page.digest}'
+    if current_info:
+        etag += f'-{current_info["user_id"]}-{current_info["rank"]}-{current_info["best_score"]}'
+    etag += '"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': format_datetime(page.last_modified, usegmt=True),
+        'Cache-Control': 'private, no-cache',  # le navigateur garde la réponse mais revalide à chaque fois
     }
+
+    # Last-Modified ne tient compte que de la page : pour un joueur connecté on se fie uniquement à l'ETag
+    if not_modified(request, etag, None if current_info else page.last_modified):
+        return Response(status_code=304, headers=headers)
+
+    body = encode_with({
+        'current_user': current_info,
+        'limit': limit,
+        'offset': offset,
+        'has_more': page.has_more,
+        'period': period,
+        'period_start': page.start.isoformat() if page.start else None
+    }, ranking=page.json)
+    return Response(body, media_type='application/json', headers=headers)
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    Indique si le navigateur a déjà la bonne version de la réponse.
     
-app.mount("/static", StaticFiles(directory="static"), name="static")
+    Args:
+        request: La requête HTTP
+        etag: L'ETag de la réponse actuelle
+        last_modified: Date de dernière modification de la réponse actuelle (None pour l'ignorer)
+        
+    Returns:
+        True si on peut répondre 304 Not Modified
+    """
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag in [tag.strip() for tag in if_none_match.split(',')]
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since is not None and last_modified is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+
+    return False
+    
+@app.get('/metrics', response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Mesures de performance au format texte Prometheus : latence et requêtes SQL par route,
+    occupation des caches et des pools de connexions.
     
+    Returns:
+        Le texte au format Prometheus
+    """
+    gauges = [
+        ('dactylogame_active_games', "Parties en cours dans le cache", {}, len(active_games)),
+        ('dactylogame_token_cache_size', "Tokens JWT en cache", {}, token_cache.stats()['size']),
+    ]
+    for name, pool in (('sync', engine.pool), ('async', async_engine.pool)):
+        for key, value in pool_stats(pool).items():
+            if isinstance(value, (int, float)):
+                gauges.append((f'dactylogame_db_pool_{key}', f"Pool de connexions : {key}", {'engine': name}, value))
+    for name, limiter in (('ip', ip_limiter), ('session', session_limiter)):
+        gauges.append(('dactylogame_rate_limit_buckets', "Seaux de limitation de débit en mémoire", {'budget': name}, len(limiter)))
+    return PlainTextResponse(metrics.render(gauges), media_type='text/plain; version=0.0.4')
+
+@app.get('/api/internal/stats')
+def internal_stats():
+    """
+    Compteurs internes des caches et des pools de connexions (pour le suivi des performances).
+    
+    Returns:
+        Les statistiques de chaque cache et de chaque pool
+    """
+    return {
+        'token_cache': token_cache.stats(),
+        'ranking_cache': {'hits': ranking_cache.hits, 'misses': ranking_cache.misses},
+        'active_games': {'size': len(active_games)},
+        'last_purge': maintenance.last_purge_report,
+        'db_pool': {'sync': pool_stats(engine.pool), 'async': pool_stats(async_engine.pool)},
+        'rate_limit': {'ip': ip_limiter.stats(), 'session': session_limiter.stats(), 'shed': ratelimit.shed_count}
+    }
+
+
 if __name__ == '__main__':
     uvicorn.run('main:app', host='127.0.0.1', port=8000, reload=True)
     
-# uvicorn main:app --reload
+# uvicorn main:app --reload (développement)
+# python serve.py --workers 4 (production, voir serve.py)
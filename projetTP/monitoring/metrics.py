@@ -0,0 +1,243 @@
+"""
+Mesures de performance de l'application Dactylogame, au format Prometheus (/metrics).
+
+Pour chaque requête HTTP, on mesure (étiquettes : méthode + route, ex: "POST /api/check-word") :
+- la latence (histogramme) et le code de retour
+- le nombre de requêtes SQL et le temps passé en BDD
+
+Les requêtes SQL sont comptées par les événements before/after_cursor_execute des moteurs
+SQLAlchemy (voir instrument_engine), et rattachées à la requête HTTP en cours via une ContextVar.
+Un nombre de requêtes SQL élevé pour une route signale un problème de type N+1.
+Chaque requête HTTP est mesurée par MetricsMiddleware (middleware ASGI).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bornes (en secondes) de l'histogramme de latence
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Bornes de l'histogramme du nombre de requêtes SQL par requête HTTP
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+@dataclass
+class RequestStats:
+    """Requêtes SQL d'une requête HTTP en cours"""
+    queries: int = 0
+    db_time: float = 0.0  # secondes
+
+
+# Requête HTTP en cours (None hors d'une requête, ex: tâche de purge en arrière-plan)
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    """Histogramme cumulatif (compteur par borne + somme + nombre), comme un histogram Prometheus"""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # la valeur est comptée dans la première borne >= valeur (le cumul est fait à l'affichage)
+        position = bisect_left(self.buckets, value)
+        if position < len(self.counts):
+            self.counts[position] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Compteurs et histogrammes de toutes les routes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: dict[tuple[str, str, int], int] = defaultdict(int)  # (méthode, route, statut) -> nombre
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.query_count: dict[tuple[str, str], Histogram] = {}
+        self.db_time: dict[tuple[str, str], float] = defaultdict(float)
+        # requêtes SQL faites en dehors d'une requête HTTP (tâches de fond, WebSocket...)
+        self.background_queries = 0
+        self.background_db_time = 0.0
+
+    def observe_request(self, method: str, route: str, status: int, duration: float, stats: RequestStats) -> None:
+        """
+        Enregistre une requête HTTP terminée.
+
+        Args:
+            method: Méthode HTTP
+            route: Chemin de la route (modèle, ex: "/api/ranking")
+            status: Code de retour
+            duration: Durée totale (en secondes)
+            stats: Requêtes SQL faites pendant la requête
+        """
+        key = (method, route)
+        with self._lock:
+            self.requests[(method, route, status)] += 1
+            if key not in self.latency:
+                self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.query_count[key] = Histogram(QUERY_COUNT_BUCKETS)
+            self.latency[key].observe(duration)
+            self.query_count[key].observe(stats.queries)
+            self.db_time[key] += stats.db_time
+
+    def observe_query(self, duration: float) -> None:
+        """Enregistre une requête SQL (rattachée à la requête HTTP en cours s'il y en a une)"""
+        stats = current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_time += duration
+        else:
+            with self._lock:
+                self.background_queries += 1
+                self.background_db_time += duration
+
+    def render(self, gauges: Optional[list[tuple[str, str, dict, float]]] = None) -> str:
+        """
+        Exporte les mesures au format texte Prometheus.
+
+        Args:
+            gauges: Valeurs instantanées en plus, sous la forme (nom, description, étiquettes, valeur)
+
+        Returns:
+            Le texte à renvoyer sur /metrics
+        """
+        lines = []
+        with self._lock:
+            lines += [
+                "# HELP http_requests_total Nombre de requêtes HTTP par route et code de retour",
+                "# TYPE http_requests_total counter",
+            ]
+            for (method, route, status), value in sorted(self.requests.items()):
+                lines.append(f"http_requests_total{_labels(method=method, route=route, status=status)} {value}")
+
+            _render_histogram(lines, "http_request_duration_seconds", "Latence des requêtes HTTP par route", self.latency)
+            _render_histogram(lines, "db_queries_per_request", "Nombre de requêtes SQL par requête HTTP", self.query_count)
+
+            lines += [
+                "# HELP db_query_duration_seconds_total Temps total passé en BDD par route",
+                "# TYPE db_query_duration_seconds_total counter",
+            ]
+            for (method, route), value in sorted(self.db_time.items()):
+                lines.append(f"db_query_duration_seconds_total{_labels(method=method, route=route)} {value:.6f}")
+            lines += [
+                "# HELP db_background_queries_total Requêtes SQL faites hors requête HTTP",
+                "# TYPE db_background_queries_total counter",
+                f"db_background_queries_total {self.background_queries}",
+                "# HELP db_background_query_duration_seconds_total Temps passé en BDD hors requête HTTP",
+                "# TYPE db_background_query_duration_seconds_total counter",
+                f"db_background_query_duration_seconds_total {self.background_db_time:.6f}",
+            ]
+
+        declared = set()
+        for name, description, labels, value in gauges or []:
+            if name not in declared:
+                lines += [f"# HELP {name} {description}", f"# TYPE {name} gauge"]
+                declared.add(name)
+            lines.append(f"{name}{_labels(**labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _render_histogram(lines: list[str], name: str, description: str, histograms: dict) -> None:
+    lines += [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le=bound)} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(method=method, route=route)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{_labels(method=method, route=route)} {histogram.count}")
+
+
+metrics = Metrics()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Compte les requêtes SQL d'un moteur (pour un moteur asynchrone : passer async_engine.sync_engine).
+
+    Args:
+        engine: Le moteur SQLAlchemy synchrone
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        metrics.observe_query(time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(exception_context):
+        # la requête a échoué : after_cursor_execute ne sera pas appelé
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            metrics.observe_query(time.perf_counter() - conn.info["query_started"].pop())
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : mesure la latence, le code de retour et les requêtes SQL de chaque requête HTTP.
+    Middleware ASGI "pur" (et non BaseHTTPMiddleware) : la réponse n'est pas recopiée,
+    et la route s'exécute dans la même tâche (donc avec la même ContextVar).
+    """
+
+    def __init__(self, app, server_timing: bool = False):
+        """
+        Args:
+            app: L'application ASGI suivante
+            server_timing: Ajoute l'en-tête Server-Timing (temps total, temps BDD et nombre de requêtes SQL)
+        """
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_measured(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                if self.server_timing:
+                    header = (
+                        f'app;dur={(time.perf_counter() - started) * 1000:.1f}, '
+                        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} requetes SQL"'
+                    )
+                    message = {**message, 'headers': [*message.get('headers', []), (b'server-timing', header.encode('latin-1'))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_measured)
+        finally:
+            duration = time.perf_counter() - started
+            current_request.reset(token)
+            # modèle de la route ("/api/ranking") plutôt que l'URL, pour garder peu d'étiquettes différentes
+            route = getattr(scope.get('route'), 'path', 'unmatched')
+            metrics.observe_request(scope['method'], route, status_code, duration, stats)
@@ -0,0 +1,166 @@
+"""
+Lancement de Dactylogame en production, sur plusieurs processus.
+
+L'application (liste de mots, fichiers statiques compressés, modèles, configuration
+des moteurs SQLAlchemy) est chargée une seule fois dans le processus parent, puis
+les workers sont créés par fork : ils partagent ces données en mémoire (copy-on-write)
+au lieu de les recharger chacun.
+
+Le parent ouvre le socket d'écoute, partagé par tous les workers, relance un worker
+qui s'arrête anormalement, et à l'arrêt (SIGTERM / Ctrl+C) laisse chaque worker
+terminer ses requêtes en cours (au plus --drain secondes).
+
+Usage (depuis n'importe quel dossier) :
+    python projetTP/serve.py --workers 4 --port 8000
+
+Avec plusieurs workers, chaque processus a ses propres caches. Par défaut :
+- les compteurs des parties sont écrits en BDD à chaque mot (ACTIVE_GAME_WRITE_THROUGH=1)
+- les parties anonymes sont enregistrées en BDD (ANONYMOUS_STATELESS=0)
+Le classement et le cache des tokens restent propres à chaque worker (données au plus
+RANKING_CACHE_MAX_AGE / TOKEN_CACHE_TTL secondes en retard).
+"""
+
+import argparse
+import gc
+import importlib.util
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
+
+# Durée max (en secondes) laissée aux requêtes en cours à l'arrêt
+DRAIN_TIMEOUT = int(os.getenv("DRAIN_TIMEOUT", "20"))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Lance Dactylogame sur plusieurs processus")
+    parser.add_argument('--host', default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument('--port', type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument('--workers', type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+                        help="Nombre de processus (0 = un par cœur)")
+    parser.add_argument('--drain', type=int, default=DRAIN_TIMEOUT,
+                        help="Durée max (en secondes) pour finir les requêtes en cours à l'arrêt")
+    parser.add_argument('--backlog', type=int, default=2048)
+    return parser.parse_args(argv)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Ouvre le socket d'écoute, partagé par tous les workers"""
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(index: int, sock: socket.socket, args) -> None:
+    """Code d'un worker (processus enfant) : sert l'application sur le socket partagé jusqu'à SIGTERM"""
+    import uvicorn
+    import main
+    from db import maintenance
+    from db.database import engine, async_engine
+
+    # les connexions ouvertes par le parent ne doivent pas être réutilisées dans l'enfant
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+    # une seule purge en arrière-plan pour tous les workers
+    if index != 0:
+        maintenance.PURGE_INTERVAL = 0
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    config = uvicorn.Config(
+        main.app,
+        # uvloop / httptools s'ils sont installés (pip install uvicorn[standard]), sinon asyncio / h11
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        timeout_graceful_shutdown=args.drain,
+        proxy_headers=True,
+        log_level="info",
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def spawn(index: int, sock: socket.socket, args) -> int:
+    """Crée le worker n°index (fork) et retourne son pid"""
+    pid = os.fork()
+    if pid == 0:
+        # groupe de processus à part : Ctrl+C n'arrive qu'au parent, qui arrête les workers un par un
+        os.setpgid(0, 0)
+        try:
+            run_worker(index, sock, args)
+            os._exit(0)
+        except BaseException:
+            traceback.print_exc()
+            os._exit(1)
+    return pid
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    # l'application doit être importable depuis n'importe quel dossier
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if workers > 1:
+        os.environ.setdefault("ACTIVE_GAME_WRITE_THROUGH", "1")
+        os.environ.setdefault("ANONYMOUS_STATELESS", "0")
+
+    # Préchargement dans le parent : tout ce qui est lu à l'import est partagé par les workers
+    import main as application  # noqa: F401
+    from db.database import IS_SQLITE, create_tables, engine
+
+    if IS_SQLITE:
+        # créées une fois ici plutôt que par chaque worker en même temps
+        create_tables()
+    engine.dispose()
+
+    # les objets chargés ne seront plus parcourus par le ramasse-miettes :
+    # leurs pages mémoire restent partagées au lieu d'être copiées dans chaque worker
+    gc.freeze()
+
+    sock = bind_socket(args.host, args.port, args.backlog)
+    print(f"Dactylogame : {workers} workers sur http://{args.host}:{args.port} (parent {os.getpid()})", flush=True)
+
+    children = {spawn(i, sock, args): i for i in range(workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is None:
+            continue
+        if not stopping:
+            # worker arrêté anormalement : on le remplace (en évitant une boucle trop rapide)
+            print(f"Worker {index} (pid {pid}) arrêté (statut {status}), redémarrage", flush=True)
+            time.sleep(1)
+            children[spawn(index, sock, args)] = index
+
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
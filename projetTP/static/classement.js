@@ -1,8 +1,12 @@
+// Nombre de joueurs affichés par page du classement
+const TAILLE_PAGE = 50
+
 // Appel de la data du classement
+// Entrée : offset (int): nombre de joueurs à sauter (0 pour la première page)
 // Return : Données du classement si l'appel a réussi (json || null) 
-async function fetchRanking() {
+async function fetchRanking(offset = 0) {
   try {
-    const response = await fetch('/api/ranking', {
+    const response = await fetch(`/api/ranking?limit=${TAILLE_PAGE}&offset=${offset}`, {
       headers: {
         ...(authToken && { 'Authorization': `Bearer ${authToken}` })
       }
@@ -30,7 +34,8 @@ async function fetchRanking() {
 //     {'rank': 3, 'user_id': 7, 'username': 'hjddhsdij', 'best_score': 21},
 //     ...
 //   ], 
-//   'current_user': {'rank': 2, 'user_id': 10, 'username': 'jdk', 'best_score': 23}
+//   'current_user': {'rank': 2, 'user_id': 10, 'username': 'jdk', 'best_score': 23},
+//   'limit': 50, 'offset': 0, 'has_more': true
 // }
 
 function renderRanking(containerSelector, data) {
@@ -56,15 +61,40 @@ function renderRanking(containerSelector, data) {
 
   const currentId = data.current_user ? data.current_user.user_id : (currentUser ? currentUser.id : null)
 
-  data.ranking.forEach(row => {
+  addRankingRows(tbody, data.ranking, currentId)
+
+  table.appendChild(tbody)
+  container.appendChild(table)
+
+  // Bouton pour charger la page suivante du classement
+  if (data.has_more) {
+    const btnMore = document.createElement('button')
+    btnMore.className = 'btn-auth'
+    btnMore.textContent = 'Voir plus'
+    let offset = data.offset + data.ranking.length
+    btnMore.onclick = async () => {
+      const page = await fetchRanking(offset)
+      if (!page) return
+      addRankingRows(tbody, page.ranking, currentId)
+      offset += page.ranking.length
+      if (!page.has_more) btnMore.remove()
+    }
+    container.appendChild(btnMore)
+  }
+}
+
+// Ajoute des lignes au tableau du classement
+// Entrée : 
+//   - tbody: le corps du tableau
+//   - rows (array): lignes du classement
+//   - currentId (int || null): id du joueur connecté (sa ligne est mise en valeur)
+function addRankingRows(tbody, rows, currentId) {
+  rows.forEach(row => {
     const tr = document.createElement('tr')
     if (currentId !== null && row.user_id === currentId) tr.className = 'highlight'
     tr.innerHTML = `<td>#${row.rank}</td><td>${escapeHtml(row.username || 'Inconnu')}</td><td>${row.best_score}</td>`
     tbody.appendChild(tr)
   })
-
-  table.appendChild(tbody)
-  container.appendChild(table)
 }
 
 // Fonction permettant d'échapper les caractères spéciaux permettant d'établir une faille XSS
@@ -17,6 +17,17 @@ let texte = ""
 let score = 0
 let sessionId = null
 
+// mots tapés pas encore envoyés au serveur : ils sont envoyés par lots (moins de requêtes)
+const DELAI_ENVOI_MOTS = 300 // ms
+let motsEnAttente = []
+let envoiTimer = null
+let envoiEnCours = Promise.resolve()
+// nombre d'envois d'un lot quand le serveur répond 429 / 503 (Retry-After respecté entre deux envois)
+const TENTATIVES_ENVOI = 5
+
+// connexion WebSocket de la partie (null si indisponible : on passe alors par les routes HTTP)
+let socketJeu = null
+
 // var globales pour l'auth
 let currentUser = null
 let authToken = null
@@ -239,8 +250,13 @@ function finPartie(){
   document.querySelector('.finPartie').style.display = 'flex'
   document.querySelector('.btnPage').style.display = 'flex'
 
-  // Envoyer la fin de partie au serveur (le score est calculé côté serveur, sécurisé)
-  fetch("/api/end-game", {
+  // Envoyer les derniers mots puis la fin de partie au serveur (le score est calculé côté serveur, sécurisé)
+  if(socketJeu && socketJeu.readyState === WebSocket.OPEN){
+    socketJeu.send(JSON.stringify({ type: 'end' })) // le serveur répond avec un message "ended"
+    return
+  }
+
+  envoyerMots().then(() => fetch("/api/end-game", {
     method: 'POST',
     headers: {
       'Content-Type': 'application/json',
@@ -249,19 +265,26 @@ function finPartie(){
     body: JSON.stringify({
       session_id: sessionId
     })
-  })
+  }))
     .then(response => response.json())
-    .then(data => {
-      document.querySelector('.messageFin').innerHTML = `Partie terminée !`
-      document.querySelector('.scoresFin').innerHTML = `Votre score : ${data.score} point(s)<br>Mots corrects : ${data.words_correct}<br>Mots incorrects : ${data.words_wrong}`
-    })
+    .then(data => afficherScoresFin(data))
     .catch(error => {
       console.error('Erreur lors de la fin de partie:', error)
-      document.querySelector('.messageFin').innerHTML = `Partie terminée !`
-      document.querySelector('.scoresFin').innerHTML = `Votre score : ${score} point(s)`
+      afficherScoresFin(null)
     })
 }
 
+// Affiche les stats de fin de partie
+// Entrée : data (json || null): stats calculées par le serveur
+function afficherScoresFin(data){
+  document.querySelector('.messageFin').innerHTML = `Partie terminée !`
+  if(data){
+    document.querySelector('.scoresFin').innerHTML = `Votre score : ${data.score} point(s)<br>Mots corrects : ${data.words_correct}<br>Mots incorrects : ${data.words_wrong}`
+  } else {
+    document.querySelector('.scoresFin').innerHTML = `Votre score : ${score} point(s)`
+  }
+}
+
 // convertit tableau de mots en chaîne
 function arrToString(arr){
   return arr.join(' ')
@@ -274,7 +297,48 @@ function stringToArr(str){
 }
 
 // demande un texte aléatoire et init la partie
+// La partie passe par un WebSocket (un message par mot) ; si le WebSocket ne s'ouvre pas, on utilise les routes HTTP
 function randomText(){
+  if(!('WebSocket' in window)){
+    randomTextHttp()
+    return
+  }
+
+  const protocole = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
+  const socket = new WebSocket(`${protocole}//${window.location.host}/ws/game`)
+
+  socket.onopen = () => {
+    socket.send(JSON.stringify({ type: 'start', token: authToken }))
+  }
+
+  socket.onmessage = (event) => {
+    const data = JSON.parse(event.data)
+    if(data.type === 'started'){
+      socketJeu = socket
+      initTexte(data)
+    } else if(data.type === 'result'){
+      appliquerResultat(data)
+      document.querySelector('#scoreJoueur').innerHTML = score
+      affichageTexte()
+    } else if(data.type === 'ended'){
+      afficherScoresFin(data)
+    } else if(data.type === 'error'){
+      console.error('Erreur du serveur de jeu:', data.detail)
+    }
+  }
+
+  socket.onerror = () => {
+    // le WebSocket n'a jamais fonctionné : on repasse en HTTP
+    if(!socketJeu) randomTextHttp()
+  }
+
+  socket.onclose = () => {
+    socketJeu = null
+  }
+}
+
+// demande un texte aléatoire via HTTP
+function randomTextHttp(){
   fetch("/api/start-game", {
     method: 'POST',
     headers: {
@@ -283,56 +347,108 @@ function randomText(){
     }
   })
     .then(response => response.json())
-    .then(data => {
-      sessionId = data.session_id
-      texteArr = data.texte
-      texte = arrToString(texteArr)
-      affichageTexte()
-    })
+    .then(data => initTexte(data))
     .catch(error => {
       console.error('Erreur lors du démarrage de la partie:', error)
       alert('Erreur lors du démarrage de la partie')
     })
 }
 
-// Gère la saisie et valide les mots
+// init la partie avec le texte reçu du serveur
+function initTexte(data){
+  sessionId = data.session_id
+  texteArr = data.texte
+  texte = arrToString(texteArr)
+  affichageTexte()
+}
+
+// Met à jour les mots gagnés/perdus selon la réponse du serveur
+// Entrée : result (json): {index, correct}
+function appliquerResultat(result){
+  if(result.correct){
+    motWin.push(result.index)
+    score++
+  } else {
+    motLost.push(result.index)
+  }
+}
+
+// Gère la saisie : le mot est mis en attente puis envoyé par lot au serveur
 function taptap(){
-  if(event.key == ' ' || event.key == 'Enter'){
+  if((event.key == ' ' || event.key == 'Enter') && indexTexte < texteArr.length){
     let texteEntrer = document.querySelector('#texteEntrer')
     let motTape = texteEntrer.value.split(' ')[0]
-    
-    // Envoyer le mot au serveur pour validation
-    fetch("/api/check-word", {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-        ...(authToken && { 'Authorization': `Bearer ${authToken}` })
-      },
-      body: JSON.stringify({
-        session_id: sessionId,
-        word: motTape,
-        index: indexTexte
-      })
-    })
-      .then(response => response.json())
-      .then(data => {
-        if(data.correct){
-          motWin.push(indexTexte)
-          score++
-        } else {
-          motLost.push(indexTexte)
-        }
-        document.querySelector('#scoreJoueur').innerHTML = score
-        indexTexte = data.index
-        texteEntrer.value = ""
-        affichageTexte()
-      })
-      .catch(error => {
-        console.error('Erreur lors de la validation du mot:', error)
-      })
+
+    const tentative = { index: indexTexte, word: motTape }
+    indexTexte++
+    texteEntrer.value = ""
+    affichageTexte()
+
+    // WebSocket : un message par mot, la réponse arrive dans socket.onmessage
+    if(socketJeu && socketJeu.readyState === WebSocket.OPEN){
+      socketJeu.send(JSON.stringify({ type: 'check', ...tentative }))
+      return
+    }
+
+    motsEnAttente.push(tentative)
+    if(!envoiTimer){
+      envoiTimer = setTimeout(envoyerMots, DELAI_ENVOI_MOTS)
+    }
   }
 }
 
+// Envoie les mots en attente au serveur pour validation (un seul appel pour tout le lot)
+// Return : Promise résolue quand le lot a été traité
+function envoyerMots(){
+  clearTimeout(envoiTimer)
+  envoiTimer = null
+  if(motsEnAttente.length == 0) return envoiEnCours
+
+  const lot = motsEnAttente
+  motsEnAttente = []
+
+  // les lots sont envoyés l'un après l'autre pour garder l'ordre des index
+  envoiEnCours = envoiEnCours.then(() => envoyerLot(lot, TENTATIVES_ENVOI))
+    .then(data => {
+      data.results.forEach(appliquerResultat)
+      document.querySelector('#scoreJoueur').innerHTML = score
+      affichageTexte()
+    })
+    .catch(error => {
+      console.error('Erreur lors de la validation des mots:', error)
+    })
+  return envoiEnCours
+}
+
+// Envoie un lot de mots à /api/check-words
+// Si le serveur limite les requêtes (429) ou est surchargé (503), le lot est renvoyé après Retry-After
+// Entrée : lot (array): les mots à valider, tentatives (int): nombre d'envois restants
+// Return : Promise des résultats du serveur ({results: [...]})
+function envoyerLot(lot, tentatives){
+  return fetch("/api/check-words", {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(authToken && { 'Authorization': `Bearer ${authToken}` })
+    },
+    body: JSON.stringify({
+      session_id: sessionId,
+      words: lot
+    })
+  })
+    .then(response => {
+      if((response.status == 429 || response.status == 503) && tentatives > 1){
+        const attente = parseInt(response.headers.get('Retry-After')) || 1
+        return new Promise(resolve => setTimeout(resolve, attente * 1000))
+          .then(() => envoyerLot(lot, tentatives - 1))
+      }
+      if(!response.ok){
+        throw new Error(`HTTP ${response.status}`)
+      }
+      return response.json()
+    })
+}
+
 // affiche texte avec couleurs mots
 function affichageTexte(){
   let textePlacer = document.querySelector('#textePlacer')
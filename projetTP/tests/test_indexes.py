@@ -0,0 +1,121 @@
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import create_engine, select, func, text, and_, or_
+
+# Ajouter le répertoire parent au path pour importer db
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pas besoin du serveur MySQL pour ces tests
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from db.database import Base, BestScore, GameSession, PeriodBestScore, Score, User
+
+# === Configuration des tests ===
+@pytest.fixture(scope="module")
+def engine():
+    """Base SQLite en mémoire avec le schéma des modèles (donc leurs index)"""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def query_plan(engine, statement) -> str:
+    """Retourne le plan d'exécution SQLite (EXPLAIN QUERY PLAN) d'une requête SQLAlchemy"""
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def assert_uses_index(plan: str, table: str, index: str):
+    """Vérifie que la table est lue via l'index attendu, et jamais parcourue en entier"""
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan, plan
+    assert f"SCAN {table}\n" not in plan + "\n", plan
+
+
+# === Tests des requêtes du classement ===
+def testRankingPage(engine):
+    """La page du classement est lue dans l'ordre de l'index, sans tri"""
+    statement = (
+        select(BestScore.user_id, User.username, BestScore.best_score)
+        .outerjoin(User, User.id == BestScore.user_id)
+        .order_by(BestScore.best_score.desc(), BestScore.achieved_at, BestScore.player_id)
+        .limit(51)
+        .offset(100)
+    )
+    plan = query_plan(engine, statement)
+    assert_uses_index(plan, "best_scores", "idx_ranking")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def testDenseRank(engine):
+    """Le rang d'un score est compté sur l'index"""
+    statement = select(func.count(func.distinct(BestScore.best_score))).where(BestScore.best_score > 42)
+    assert_uses_index(query_plan(engine, statement), "best_scores", "idx_ranking")
+
+
+def testUserBestScore(engine):
+    """Le meilleur score d'un joueur est lu dans l'index (user_id, score)"""
+    statement = select(func.max(Score.score)).where(Score.user_id == 1)
+    assert_uses_index(query_plan(engine, statement), "scores", "idx_user_score")
+
+
+def testUserHistory(engine):
+    """L'historique d'un joueur (pagination par curseur) est lu dans l'ordre de l'index (user_id, created_at)"""
+    cursor = datetime(2025, 1, 1)
+    statement = (
+        select(Score)
+        .where(
+            Score.user_id == 1,
+            or_(Score.created_at < cursor, and_(Score.created_at == cursor, Score.id < 42))
+        )
+        .order_by(Score.created_at.desc(), Score.id.desc())
+        .limit(11)
+    )
+    plan = query_plan(engine, statement)
+    assert_uses_index(plan, "scores", "idx_user_created")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+# === Tests de la purge des sessions ===
+def testPurgeSessions(engine):
+    """La purge ne parcourt que les sessions non terminées et expirées"""
+    statement = (
+        select(GameSession.id)
+        .where(
+            GameSession.is_completed == False,
+            GameSession.expected_end_time < datetime(2025, 1, 1),
+            GameSession.id > 0
+        )
+        .order_by(GameSession.id)
+        .limit(500)
+    )
+    assert_uses_index(query_plan(engine, statement), "game_sessions", "idx_purge")
+
+
+# === Tests des classements par période ===
+def testPeriodRankingPage(engine):
+    """La page du classement du jour ne lit que les lignes du jour, dans l'ordre de l'index"""
+    statement = (
+        select(PeriodBestScore.user_id, User.username, PeriodBestScore.best_score)
+        .outerjoin(User, User.id == PeriodBestScore.user_id)
+        .where(PeriodBestScore.period == 'day', PeriodBestScore.period_start == date(2025, 1, 1))
+        .order_by(PeriodBestScore.best_score.desc(), PeriodBestScore.achieved_at, PeriodBestScore.player_id)
+        .limit(51)
+    )
+    plan = query_plan(engine, statement)
+    assert_uses_index(plan, "period_best_scores", "idx_period_ranking")
+    assert "TEMP B-TREE" not in plan, plan
+
+
+def testPeriodDenseRank(engine):
+    """Le rang d'un score dans le classement de la semaine est compté sur l'index"""
+    statement = select(func.count(func.distinct(PeriodBestScore.best_score))).where(
+        PeriodBestScore.period == 'week',
+        PeriodBestScore.period_start == date(2024, 12, 30),
+        PeriodBestScore.best_score > 42
+    )
+    assert_uses_index(query_plan(engine, statement), "period_best_scores", "idx_period_ranking")
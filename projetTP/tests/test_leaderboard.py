@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+# Ajouter le répertoire parent au path pour importer db et game
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# pas besoin du serveur MySQL pour ces tests
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from db.database import Base, BestScore, PeriodBestScore
+from game.leaderboard import period_start, update_best_score
+
+PLAYED_AT = datetime(2026, 3, 4, 12, 0)
+
+
+# === Configuration des tests ===
+@pytest.fixture
+def database(tmp_path):
+    """Base SQLite dans un fichier, partagée par une session synchrone et une session asynchrone"""
+    path = tmp_path / "leaderboard.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield sessionmaker(bind=engine), async_sessionmaker(async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+    engine.dispose()
+
+
+def best_scores(Session, player_id: int) -> dict:
+    """Les meilleurs scores d'un joueur, par période"""
+    with Session() as db:
+        scores = {'all': db.scalar(select(BestScore.best_score).where(BestScore.player_id == player_id))}
+        for row in db.execute(select(PeriodBestScore).where(PeriodBestScore.player_id == player_id)).scalars():
+            scores[row.period] = row.best_score
+    return scores
+
+
+def insert_best_scores(Session, player_id: int, score: int):
+    """Crée les lignes de meilleur score d'un joueur depuis une autre session (partie terminée en parallèle)"""
+    with Session() as db:
+        db.add(BestScore(player_id=player_id, user_id=player_id, best_score=score, achieved_at=PLAYED_AT))
+        for period in ('day', 'week'):
+            db.add(PeriodBestScore(
+                period=period, period_start=period_start(period, PLAYED_AT), player_id=player_id,
+                user_id=player_id, best_score=score, achieved_at=PLAYED_AT
+            ))
+        db.commit()
+
+
+# === Tests des meilleurs scores ===
+def testFirstGameCreatesRows(database):
+    """La première partie d'un joueur crée ses lignes (global, jour, semaine)"""
+    Session, AsyncSession = database
+
+    async def scenario():
+        async with AsyncSession() as db:
+            records = await update_best_score(db, 1, 12, PLAYED_AT)
+            await db.commit()
+        return records
+
+    assert asyncio.run(scenario()) == ['all', 'day', 'week']
+    assert best_scores(Session, 1) == {'all': 12, 'day': 12, 'week': 12}
+
+
+def testOnlyHigherScoreIsRecord(database):
+    """Un score plus bas ne change rien, un score plus haut relève toutes les lignes"""
+    Session, AsyncSession = database
+    insert_best_scores(Session, 1, 20)
+
+    async def scenario():
+        async with AsyncSession() as db:
+            lower = await update_best_score(db, 1, 15, PLAYED_AT)
+            higher = await update_best_score(db, 1, 25, PLAYED_AT)
+            await db.commit()
+        return lower, higher
+
+    assert asyncio.run(scenario()) == ([], ['all', 'day', 'week'])
+    assert best_scores(Session, 1) == {'all': 25, 'day': 25, 'week': 25}
+
+
+@pytest.mark.parametrize("score, expected", [(30, []), (80, ['all', 'day', 'week'])])
+def testConcurrentFirstGame(database, score, expected):
+    """
+    Les lignes sont créées par une autre session entre la lecture et l'écriture
+    (deux premières parties terminées en même temps) : l'appel se termine et garde le meilleur score
+    """
+    Session, AsyncSession = database
+
+    async def scenario():
+        async with AsyncSession() as db:
+            assert await db.get(BestScore, 1) is None
+            insert_best_scores(Session, 1, 50)
+            records = await asyncio.wait_for(update_best_score(db, 1, score, PLAYED_AT), timeout=10)
+            await db.commit()
+        return records
+
+    assert asyncio.run(scenario()) == expected
+    best = max(score, 50)
+    assert best_scores(Session, 1) == {'all': best, 'day': best, 'week': best}
@@ -0,0 +1,152 @@
+"""
+Fichiers statiques de l'application Dactylogame, servis depuis la mémoire.
+
+Au démarrage, chaque fichier du dossier static/ est lu une seule fois, puis :
+- compressé à l'avance en gzip (et en brotli si le module brotli est installé)
+- identifié par une empreinte de son contenu (sha256)
+
+Chaque fichier est disponible à deux adresses :
+- /static/<nom> : adresse stable, revalidée à chaque chargement (ETag -> 304 si inchangé)
+- /assets/<nom>.<empreinte><ext> : adresse versionnée, mise en cache un an (immutable) ;
+  un fichier modifié change d'empreinte, donc d'adresse
+
+Les pages HTML référencent les adresses versionnées (remplacées au démarrage).
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+from fastapi import Request, Response
+
+try:
+    import brotli  # optionnel (pip install brotli)
+except ImportError:
+    brotli = None
+
+# Taille minimale (en octets) pour compresser un fichier
+MIN_COMPRESS_SIZE = 512
+# Types de fichiers qui gagnent à être compressés
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+
+CACHE_IMMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDATE = "no-cache"
+
+# Références aux fichiers statiques dans les pages HTML : href="/static/style.css", src="./static/script.js"
+STATIC_REFERENCE = re.compile(r'(?P<attr>href|src)="(?:\.)?/static/(?P<name>[^"?#]+)"')
+
+
+@dataclass
+class Asset:
+    """Un fichier statique en mémoire, avec ses versions compressées"""
+    name: str
+    media_type: str
+    digest: str
+    encodings: dict[str, bytes] = field(default_factory=dict)  # "identity" / "gzip" / "br" -> contenu
+
+    @property
+    def hashed_name(self) -> str:
+        stem, ext = os.path.splitext(self.name)
+        return f"{stem}.{self.digest}{ext}"
+
+
+def _compress(asset: Asset) -> None:
+    raw = asset.encodings['identity']
+    if len(raw) < MIN_COMPRESS_SIZE or not asset.media_type.startswith(COMPRESSIBLE_TYPES):
+        return
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    if len(compressed) < len(raw):
+        asset.encodings['gzip'] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(raw, quality=11)
+        if len(compressed) < len(raw):
+            asset.encodings['br'] = compressed
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """
+    Encodages acceptés par le client d'après l'en-tête Accept-Encoding.
+    ex: "gzip, deflate, br;q=0.9" -> {"gzip", "deflate", "br"}, "gzip;q=0" -> set()
+    """
+    accepted = set()
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if coding and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.lower())
+    return accepted
+
+
+class AssetStore:
+    """Fichiers statiques chargés et compressés au démarrage"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.assets: dict[str, Asset] = {}
+        self.hashed: dict[str, Asset] = {}
+
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'rb') as f:
+                raw = f.read()
+            media_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            if media_type.startswith('text/') or media_type == 'application/javascript':
+                media_type += '; charset=utf-8'
+            self.assets[name] = Asset(name, media_type, hashlib.sha256(raw).hexdigest()[:12], {'identity': raw})
+
+        # les pages HTML pointent vers les adresses versionnées (leur empreinte dépend donc de celle des fichiers)
+        for asset in self.assets.values():
+            if asset.media_type.startswith('text/html'):
+                html = STATIC_REFERENCE.sub(self._versioned_reference, asset.encodings['identity'].decode('utf-8'))
+                asset.encodings['identity'] = html.encode('utf-8')
+                asset.digest = hashlib.sha256(asset.encodings['identity']).hexdigest()[:12]
+
+        for asset in self.assets.values():
+            _compress(asset)
+            self.hashed[asset.hashed_name] = asset
+
+    def _versioned_reference(self, match: re.Match) -> str:
+        asset = self.assets.get(match.group('name'))
+        if asset is None:
+            return match.group(0)
+        return f'{match.group("attr")}="{self.url(asset.name)}"'
+
+    def url(self, name: str) -> str:
+        """Adresse versionnée d'un fichier (ex: "/assets/style.3f2a9c1b7d4e.css")"""
+        return f"/assets/{self.assets[name].hashed_name}"
+
+    def response(self, request: Request, name: str, immutable: bool = False) -> Optional[Response]:
+        """
+        Réponse HTTP pour un fichier, dans le meilleur encodage accepté par le client.
+
+        Args:
+            request: La requête (en-têtes Accept-Encoding et If-None-Match)
+            name: Nom du fichier, ou nom versionné si immutable
+            immutable: True pour une adresse versionnée (/assets/...)
+
+        Returns:
+            La réponse (200 ou 304), ou None si le fichier n'existe pas
+        """
+        asset = (self.hashed if immutable else self.assets).get(name)
+        if asset is None:
+            return None
+
+        accepted = accepted_encodings(request.headers.get('accept-encoding', ''))
+        encoding = next((e for e in ('br', 'gzip') if e in asset.encodings and e in accepted), 'identity')
+
+        headers = {
+            'Cache-Control': CACHE_IMMUTABLE if immutable else CACHE_REVALIDATE,
+            'ETag': f'"{asset.digest}-{encoding}"',
+            'Vary': 'Accept-Encoding',
+        }
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+
+        if request.headers.get('if-none-match') == headers['ETag']:
+            return Response(status_code=304, headers=headers)
+        return Response(asset.encodings[encoding], media_type=asset.media_type, headers=headers)
@@ -0,0 +1,140 @@
+"""
+Limitation du débit et délestage des routes de jeu de l'application Dactylogame.
+
+Chaque appel à /api/start-game ou /api/check-word peut coûter une transaction en BDD :
+un client (ou un bot) qui les appelle en boucle ralentit les parties des autres joueurs.
+
+- Limitation par seau à jetons (token bucket), avec deux budgets séparés :
+  par adresse IP (toutes les routes de jeu, une nouvelle partie coûte START_GAME_COST jetons)
+  et par partie (session_id, pour /api/check-word et /api/check-words).
+  Un seau se remplit de `rate` jetons par seconde, jusqu'à `burst` jetons ; une requête
+  sans jeton disponible reçoit 429 avec l'en-tête Retry-After.
+  Les seaux sont gardés en mémoire dans un LRU (au plus RATE_LIMIT_MAX_KEYS par budget) :
+  un seau inutilisé depuis longtemps est plein, le retirer ne change rien.
+- Délestage : quand l'attente moyenne récente d'une connexion du pool dépasse
+  LOAD_SHED_POOL_WAIT_MS, les routes de jeu répondent 503 (avec Retry-After) à tout le monde,
+  sauf /api/end-game (pour ne pas perdre les parties déjà jouées).
+
+Les budgets sont propres à chaque processus : avec plusieurs workers (serve.py), un client
+peut obtenir au plus un budget par worker.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from fastapi import HTTPException
+
+# RATE_LIMIT=0 pour désactiver la limitation et le délestage (ex: test de charge depuis une seule IP)
+RATE_LIMIT = os.getenv("RATE_LIMIT", "1") == "1"
+# Budget par adresse IP : jetons par seconde et réserve maximale
+# Large : une salle de classe derrière un NAT partage une IP (~30 joueurs à ~3 mots par seconde)
+IP_RATE = float(os.getenv("IP_RATE", "150"))
+IP_BURST = float(os.getenv("IP_BURST", "600"))
+# Budget par partie (un joueur rapide tape ~3 mots par seconde)
+SESSION_RATE = float(os.getenv("SESSION_RATE", "8"))
+SESSION_BURST = float(os.getenv("SESSION_BURST", "20"))
+# Nombre de jetons (du budget par IP) consommés par une nouvelle partie
+START_GAME_COST = float(os.getenv("START_GAME_COST", "5"))
+# Nombre maximum de seaux gardés en mémoire par budget
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Attente moyenne récente (en millisecondes) d'une connexion au-delà de laquelle on déleste, 0 pour désactiver
+LOAD_SHED_POOL_WAIT_MS = float(os.getenv("LOAD_SHED_POOL_WAIT_MS", "500"))
+
+
+class TokenBucketLimiter:
+    """Un seau à jetons par clé (IP ou session), dans un LRU de taille bornée"""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        # clé -> (jetons disponibles, date de mise à jour), du moins récemment utilisé au plus récent
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: str, cost: float = 1.0) -> float:
+        """
+        Consomme des jetons du seau d'une clé.
+
+        Args:
+            key: L'adresse IP ou le session_id
+            cost: Nombre de jetons demandés
+
+        Returns:
+            0 si la requête est acceptée, sinon le nombre de secondes à attendre
+        """
+        if self.rate <= 0:
+            return 0.0
+        cost = min(cost, self.burst)
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (cost - tokens) / self.rate
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # on retire le seau le moins récemment utilisé
+                self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def stats(self) -> dict:
+        return {'keys': len(self._buckets), 'allowed': self.allowed, 'rejected': self.rejected}
+
+
+ip_limiter = TokenBucketLimiter(IP_RATE, IP_BURST)
+session_limiter = TokenBucketLimiter(SESSION_RATE, SESSION_BURST)
+
+# Nombre de requêtes refusées par délestage
+shed_count = 0
+
+
+def rate_limit(limiter: TokenBucketLimiter, key: str, cost: float = 1.0) -> None:
+    """
+    Vérifie le budget d'une clé.
+
+    Raises:
+        HTTPException 429: Si le budget est épuisé (Retry-After : secondes avant d'avoir assez de jetons)
+    """
+    if not RATE_LIMIT:
+        return
+    wait = limiter.acquire(key, cost)
+    if wait > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Trop de requêtes, réessayez dans quelques secondes",
+            headers={'Retry-After': str(math.ceil(wait))}
+        )
+
+
+def shed_load(pool_wait: float) -> None:
+    """
+    Refuse la requête quand la BDD est saturée.
+
+    Args:
+        pool_wait: Attente moyenne récente d'une connexion du pool (en secondes)
+
+    Raises:
+        HTTPException 503: Si l'attente dépasse LOAD_SHED_POOL_WAIT_MS
+    """
+    global shed_count
+    if not RATE_LIMIT or LOAD_SHED_POOL_WAIT_MS <= 0 or pool_wait * 1000 <= LOAD_SHED_POOL_WAIT_MS:
+        return
+    shed_count += 1
+    raise HTTPException(
+        status_code=503,
+        detail="Serveur surchargé, réessayez dans quelques secondes",
+        headers={'Retry-After': str(max(1, math.ceil(pool_wait)))}
+    )
@@ -0,0 +1,53 @@
+"""
+Réponses JSON de l'application Dactylogame, encodées avec orjson.
+
+La réponse par défaut de FastAPI (JSONResponse) encode avec le module json standard ; orjson
+produit directement des bytes et est plusieurs fois plus rapide, ce qui compte pour les
+grosses réponses comme le classement (jusqu'à 200 joueurs par page).
+
+Les routes déclarent un modèle de réponse (response_model) : FastAPI convertit la valeur
+retournée via pydantic-core, puis FastJSONResponse l'encode avec orjson.
+Le classement va plus loin : chaque page est encodée une seule fois, à sa mise en cache,
+puis insérée telle quelle dans les réponses (voir encode_with).
+"""
+
+import json
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson  # optionnel (pip install orjson), sinon le module json standard
+except ImportError:
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Encode en JSON (types de base uniquement : dict, list, str, int, float, bool, None)"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_with(content: dict, **encoded: bytes) -> bytes:
+    """
+    Encode un objet JSON en y ajoutant des valeurs déjà encodées, sans les décoder.
+    ex: encode_with({'limit': 50}, ranking=b'[...]') -> b'{"ranking":[...],"limit":50}'
+
+    Args:
+        content: Les autres champs de l'objet (encodés ici)
+        encoded: Les champs déjà encodés en JSON
+
+    Returns:
+        L'objet JSON encodé
+    """
+    parts = [dumps(key) + b':' + value for key, value in encoded.items()]
+    body = dumps(content)
+    if body != b'{}':
+        parts.append(body[1:-1])
+    return b'{' + b','.join(parts) + b'}'
+
+
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON encodée avec orjson (classe de réponse par défaut de l'application)"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)